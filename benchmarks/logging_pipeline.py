@@ -0,0 +1,129 @@
+"""
+Benchmark pim's logging pipeline and progress renderer at high event rates.
+
+    python benchmarks/logging_pipeline.py --records 200000 --threads 1 8
+
+For each thread count it reports:
+- caller throughput: records per second logged by the calling threads, which only enqueue
+- drain time: time until the listener has written every record to the log file
+- file handler cost: time spent in the file handler per 100k records, measured without the queue
+- progress updates: ProgressRenderer.update calls per second and how many redraws they caused
+
+The log is written to a temporary directory, the user's pim.log is not touched.
+"""
+
+import argparse
+import io
+import logging
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from rich.console import Console
+
+import pim.cli_utils.console as pim_console
+import pim.cli_utils.logging_setup as logging_setup
+from pim.cli_utils.printing import ProgressRenderer
+from pim.config.config import LOG_BACKUP_COUNT, LOG_MAX_BYTES
+
+
+def log_from_threads(logger, records, threads):
+    per_thread = records // threads
+
+    def work(thread):
+        for i in range(per_thread):
+            logger.info("thread %d fetched chunk %d of model-%d", thread, i, i % 7)
+
+    workers = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads, time.perf_counter() - started
+
+
+def bench_pipeline(log_dir, records, threads):
+    logging_setup.DEFAULT_CACHE_DIR = Path(log_dir)
+    logger = logging_setup.setup_logger()
+    sent, elapsed = log_from_threads(logger, records, threads)
+    drain_started = time.perf_counter()
+    logging_setup.stop_logger()
+    drained = time.perf_counter() - drain_started
+    logger.handlers = []
+    return sent / elapsed, drained
+
+
+def bench_file_handler(log_dir, records):
+    handler = logging_setup.BufferedRotatingFileHandler(
+        Path(log_dir) / "handler.log",
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+    )
+    handler.setFormatter(
+        logging.Formatter("[%(levelname)s:%(relpath)s:%(lineno)d] %(message)s")
+    )
+    handler.addFilter(logging_setup.RelativePathFilter())
+    record_args = [
+        ("pim", logging.INFO, __file__, 1, "fetched chunk %d", (i,), None)
+        for i in range(records)
+    ]
+    prepared = [logging.LogRecord(*args) for args in record_args]
+    started = time.perf_counter()
+    for record in prepared:
+        handler.handle(record)
+    handler.close()
+    return (time.perf_counter() - started) * 100_000 / records
+
+
+def bench_progress(updates, threads):
+    # Render into a buffer, the point is the update cost, not the terminal
+    pim_console._console = Console(file=io.StringIO(), force_terminal=True)
+    renderer = ProgressRenderer()
+    redraws = 0
+    render = renderer._render
+
+    def counted_render():
+        nonlocal redraws
+        redraws += 1
+        render()
+
+    renderer._render = counted_render
+    per_thread = updates // threads
+
+    def work(thread):
+        for i in range(per_thread):
+            renderer.update(f"model-{thread}", f"model-{thread}: {i}/{per_thread} chunks")
+
+    workers = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    renderer.stop()
+    return per_thread * threads / elapsed, redraws
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        handler_cost = bench_file_handler(log_dir, args.records)
+        print(f"file handler: {handler_cost:.3f}s per 100k records")
+        for threads in args.threads:
+            rate, drained = bench_pipeline(log_dir, args.records, threads)
+            progress_rate, redraws = bench_progress(args.records, threads)
+            print(
+                f"{threads} threads: {rate:,.0f} rec/s logged, {drained:.2f}s to drain, "
+                f"{progress_rate:,.0f} progress updates/s with {redraws} redraws"
+            )
+
+
+if __name__ == "__main__":
+    main()
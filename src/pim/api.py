@@ -0,0 +1,351 @@
+"""
+Programmatic interface to pim.
+
+Unlike the CLI, these functions never call sys.exit or print to the terminal
+unless a console was set up by the caller. They return structured results and
+raise PimError subclasses. The HTTP sessions and the conda env inventory are
+reused across calls, and the *_async variants let one process run many
+installs concurrently:
+
+    import pim.api
+
+    result = pim.api.install(["huggingface:bert-base-uncased"])
+    pim.api.wait_until_ready("bert-base-uncased", timeout=600)
+    results = await asyncio.gather(*(pim.api.install_async(p) for p in pimfiles))
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pim.cli_utils.console import console_initialized, init_console
+from pim.commands.install import (
+    collect_model_data,
+    resolve_pimfile_path,
+    run_install,
+)
+from pim.config.config import (
+    API_WORKERS,
+    DEFAULT_CONDA_ENV_NAME,
+    READY_POLL_INTERVAL,
+    SUPPORTED_FRAMEWORKS,
+)
+from pim.utils import readiness
+from pim.utils.conda import list_conda_envs
+from pim.utils.pathing import validate_cache_path, validate_cache_volumes
+from pim.utils.volumes import register_cache_volumes
+
+__all__ = [
+    "PimError",
+    "PimfileError",
+    "InstallError",
+    "NotReadyError",
+    "InstallResult",
+    "ResolveResult",
+    "ModelStatus",
+    "StatusResult",
+    "install",
+    "resolve",
+    "status",
+    "prefetch",
+    "wait_until_ready",
+    "install_async",
+    "resolve_async",
+    "status_async",
+    "prefetch_async",
+    "wait_until_ready_async",
+]
+
+
+class PimError(Exception):
+    """Base class for all errors raised by pim.api."""
+
+
+class PimfileError(PimError):
+    """The Pimfile could not be found or parsed."""
+
+
+class InstallError(PimError):
+    """Setting up the environment or installing a model failed."""
+
+
+class NotReadyError(PimError, TimeoutError):
+    """A model was not ready before the timeout."""
+
+
+@dataclass
+class ResolveResult:
+    env_name: str
+    models: Dict[str, List[str]]
+    conda_dependencies: List[str] = field(default_factory=list)
+    pip_dependencies: List[str] = field(default_factory=list)
+    model_options: Dict[str, dict] = field(default_factory=dict)
+
+
+@dataclass
+class InstallResult:
+    env_name: Optional[str]
+    cache_dir: Path
+    models: Dict[str, List[str]]
+
+
+@dataclass
+class ModelStatus:
+    framework: str
+    name: str
+    installed: bool
+    path: Optional[Path] = None
+
+
+@dataclass
+class StatusResult:
+    env_name: str
+    env_exists: bool
+    models: List[ModelStatus]
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_env_inventory = None
+_env_inventory_lock = threading.Lock()
+_http_configured = False
+
+
+def _prepare():
+    """
+    Set up the process wide state the pim internals expect, once.
+    """
+    if not console_initialized():
+        # Library callers get no terminal output, errors surface as exceptions
+        init_console(quiet=True)
+        logger = logging.getLogger("pim")
+        if not logger.handlers:
+            logger.addHandler(logging.NullHandler())
+
+
+def _configure_http():
+    """
+    Size huggingface_hub's per-thread requests sessions for the API workers, once.
+    Only huggingface_hub versions built on requests expose configure_http_backend,
+    newer ones manage their own per-thread clients and are left as they are.
+    """
+    global _http_configured
+    if _http_configured:
+        return
+    _http_configured = True
+    try:
+        import requests
+        from huggingface_hub import configure_http_backend
+        from requests.adapters import HTTPAdapter
+    except ImportError:
+        return
+
+    def _session_factory():
+        # One keep-alive session per worker thread, reused by every call on that thread
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=API_WORKERS * 4)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    configure_http_backend(backend_factory=_session_factory)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=API_WORKERS, thread_name_prefix="pim-api"
+            )
+        return _executor
+
+
+def get_env_inventory(refresh=False):
+    """
+    Return the cached mapping of conda env names to prefixes, querying conda only once.
+    """
+    global _env_inventory
+    with _env_inventory_lock:
+        if _env_inventory is None or refresh:
+            _env_inventory = list_conda_envs()
+        return dict(_env_inventory)
+
+
+def _load_model_data(models, pimfile):
+    try:
+        pimfile_path = resolve_pimfile_path(models, pimfile)
+        return collect_model_data(models, pimfile_path)
+    except (FileNotFoundError, IsADirectoryError, ValueError) as e:
+        raise PimfileError(str(e)) from e
+
+
+def _framework_models(model_data):
+    return {
+        framework: list(model_data.get(framework, []))
+        for framework in sorted(SUPPORTED_FRAMEWORKS)
+        if model_data.get(framework)
+    }
+
+
+def resolve(models=None, pimfile=None):
+    """
+    Parse the Pimfile and/or 'framework:model' strings into what would be installed.
+    When neither is given, the Pimfile is looked up from the current directory upwards.
+    """
+    _prepare()
+    model_data = _load_model_data(models, pimfile)
+    return ResolveResult(
+        env_name=model_data.get("env-name", DEFAULT_CONDA_ENV_NAME),
+        models=_framework_models(model_data),
+        conda_dependencies=list(model_data.get("conda-dependencies", [])),
+        pip_dependencies=list(model_data.get("pip-dependencies", [])),
+        model_options=dict(model_data.get("model-options", {})),
+    )
+
+
+def prefetch(models=None, pimfile=None, cache_dir=None, auth=False, on_ready=None):
+    """
+    Download model files into the cache without creating or changing any environment.
+    on_ready(framework, model, model_dir) is called as each model becomes ready.
+    """
+    _prepare()
+    _configure_http()
+    from pim.commands.utils.installers import install_models
+
+    model_data = _load_model_data(models, pimfile)
+    cache_dir = register_cache_volumes(validate_cache_volumes(cache_dir))
+    try:
+        install_models(model_data, cache_dir, auth, on_ready=on_ready)
+    except Exception as e:
+        raise InstallError(str(e)) from e
+    return InstallResult(
+        env_name=None, cache_dir=cache_dir, models=_framework_models(model_data)
+    )
+
+
+def install(
+    models=None, pimfile=None, cache_dir=None, auth=False, on_ready=None, resume=False
+):
+    """
+    Set up the conda environment and install the models, like 'pim install'.
+    on_ready(framework, model, model_dir) is called as each model becomes ready,
+    before the remaining models finish. With resume an interrupted install of the
+    same models continues from its journal.
+    """
+    _prepare()
+    _configure_http()
+
+    model_data = _load_model_data(models, pimfile)
+    cache_dir = register_cache_volumes(validate_cache_volumes(cache_dir))
+    env_name = model_data.get("env-name", DEFAULT_CONDA_ENV_NAME)
+    try:
+        # Same path as 'pim install': preflight, journal, summary and resume
+        run_install(model_data, cache_dir, auth, resume=resume, on_ready=on_ready)
+        if env_name not in get_env_inventory():
+            get_env_inventory(refresh=True)
+    except Exception as e:
+        raise InstallError(str(e)) from e
+    return InstallResult(
+        env_name=env_name, cache_dir=cache_dir, models=_framework_models(model_data)
+    )
+
+
+def status(models=None, pimfile=None, cache_dir=None):
+    """
+    Report whether each model is present in the cache, without touching the network.
+    Also returns whether the target conda env exists, from the cached env inventory.
+    """
+    _prepare()
+    from huggingface_hub import snapshot_download
+
+    resolved = resolve(models, pimfile)
+    cache_dir = validate_cache_path(cache_dir)
+    statuses = []
+    for model in resolved.models.get("huggingface", []):
+        try:
+            path = Path(
+                snapshot_download(model, cache_dir=cache_dir, local_files_only=True)
+            )
+            statuses.append(ModelStatus("huggingface", model, True, path))
+        except Exception:
+            statuses.append(ModelStatus("huggingface", model, False))
+    for framework, framework_models in resolved.models.items():
+        if framework == "huggingface":
+            continue
+        # Other frameworks do not have a cache layout pim can inspect yet
+        statuses.extend(
+            ModelStatus(framework, model, False) for model in framework_models
+        )
+    return StatusResult(
+        env_name=resolved.env_name,
+        env_exists=resolved.env_name in get_env_inventory(),
+        models=statuses,
+    )
+
+
+def wait_until_ready(models, cache_dir=None, timeout=None):
+    """
+    Block until the models ('model' or 'framework:model') are published as ready
+    by an install, in this process or another one. Returns {model: ready marker}.
+    """
+    cache_dir = validate_cache_path(cache_dir)
+    try:
+        return readiness.wait_until_ready(models, cache_dir, timeout=timeout)
+    except TimeoutError as e:
+        raise NotReadyError(str(e)) from e
+    except ValueError as e:
+        raise PimError(str(e)) from e
+
+
+async def _run_async(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(fn, *args, **kwargs))
+
+
+async def install_async(
+    models=None, pimfile=None, cache_dir=None, auth=False, on_ready=None, resume=False
+):
+    return await _run_async(
+        install, models, pimfile, cache_dir, auth, on_ready, resume=resume
+    )
+
+
+async def prefetch_async(
+    models=None, pimfile=None, cache_dir=None, auth=False, on_ready=None
+):
+    return await _run_async(prefetch, models, pimfile, cache_dir, auth, on_ready)
+
+
+async def resolve_async(models=None, pimfile=None):
+    return await _run_async(resolve, models, pimfile)
+
+
+async def status_async(models=None, pimfile=None, cache_dir=None):
+    return await _run_async(status, models, pimfile, cache_dir)
+
+
+async def wait_until_ready_async(models, cache_dir=None, timeout=None):
+    # Polls on the event loop instead of holding one of the API worker threads
+    try:
+        models = readiness.check_waitable(models)
+    except ValueError as e:
+        raise PimError(str(e)) from e
+    cache_dir = validate_cache_path(cache_dir)
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    ready = {}
+    while True:
+        if readiness.collect_ready(cache_dir, models, ready):
+            return ready
+        if deadline is not None and loop.time() >= deadline:
+            pending = [model for model in models if model not in ready]
+            raise NotReadyError(
+                f"Models not ready after {timeout}s: {', '.join(pending)}"
+            )
+        await asyncio.sleep(READY_POLL_INTERVAL)
@@ -3,15 +3,32 @@ import os
 import sys
 import logging
 import argparse
+from pim.commands.bench import BenchCommand
+from pim.commands.cache import CacheCommand
+from pim.commands.daemon import DaemonCommand
 from pim.commands.install import InstallCommand
+from pim.commands.kernels import KernelsCommand
 from pim.commands.list import ListCommand
+from pim.commands.merge_manifests import MergeManifestsCommand
+from pim.commands.wait import WaitCommand
+from pim.commands.watch import WatchCommand
 from pim.cli_utils.console import init_console
 from pim.cli_utils.logging_setup import setup_logger
 
 
 def main():
 
-    commands = {"install": InstallCommand(), "list": ListCommand()}
+    commands = {
+        "install": InstallCommand(),
+        "list": ListCommand(),
+        "merge-manifests": MergeManifestsCommand(),
+        "daemon": DaemonCommand(),
+        "cache": CacheCommand(),
+        "watch": WatchCommand(),
+        "bench": BenchCommand(),
+        "wait": WaitCommand(),
+        "kernels": KernelsCommand(),
+    }
 
     parser = argparse.ArgumentParser(
         description="A CLI to declaratively install and manage machine learning models from a Pimfile."
@@ -10,12 +10,16 @@ _debug_mode = None
 # Shared console instance for the application
 # This allows for consistent styling and configuration across different modules
 # It can be initialized with no_color=True to disable color output if needed
-def init_console(no_color=False, debug=False):
+def init_console(no_color=False, debug=False, quiet=False):
     global _console, _debug_mode
-    _console = Console(no_color=no_color)
+    _console = Console(no_color=no_color, quiet=quiet)
     _debug_mode = debug
 
 
+def console_initialized():
+    return _console is not None
+
+
 def get_console():
     if _console is None:
         logging.error("Console not initialized. Call init_console() first.")
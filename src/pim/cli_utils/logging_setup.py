@@ -1,10 +1,17 @@
+import atexit
 import logging
 import os
+import queue
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from pim.config.config import DEFAULT_CACHE_DIR
+from pim.config.config import DEFAULT_CACHE_DIR, LOG_BACKUP_COUNT, LOG_MAX_BYTES
+
+_listener = None
 
 
 def setup_logger(debug=False):
+    global _listener
     log_path = DEFAULT_CACHE_DIR / "pim.log"
 
     os.makedirs(os.path.dirname(log_path), exist_ok=True)
@@ -13,26 +20,107 @@ def setup_logger(debug=False):
     logger = logging.getLogger("pim")
     logger.setLevel(logging.DEBUG)
     logger.handlers = []  # Clear existing handlers
+    stop_logger()
 
-    # File handler
-    file_handler = logging.FileHandler(log_path, mode="w")
+    # File handler, appends across runs and rotates instead of truncating
+    file_handler = BufferedRotatingFileHandler(
+        log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT
+    )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(
         logging.Formatter("[%(levelname)s:%(relpath)s:%(lineno)d] %(message)s")
     )
-    logger.addHandler(file_handler)
-    logger.addFilter(RelativePathFilter())
+    # Runs on the listener thread, so path handling stays off the caller's hot path
+    file_handler.addFilter(RelativePathFilter())
+    handlers = [file_handler]
 
     # Optional stdout handler
     if debug:  # TODO This causes doulbe printing in console when debug mode is on
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.DEBUG)
         console_handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
+
+    # Callers only enqueue records, a background listener does the actual I/O
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logger)
+    logger.addHandler(LightQueueHandler(log_queue))
 
     return logger
 
 
+def stop_logger():
+    """
+    Flush pending log records and stop the background listener.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+class LightQueueHandler(QueueHandler):
+    """
+    QueueHandler that only merges the message arguments before enqueueing,
+    skipping the full format and record copy done by the stdlib version.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Tracebacks cannot cross the queue, render them now
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """
+    Append-mode rotating file handler tuned for high record rates.
+    It tracks the file size itself instead of stat/seek calls per record, formats each
+    record once, and only flushes the stream for warnings and above or when closed.
+    """
+
+    def __init__(self, filename, maxBytes=0, backupCount=0, encoding="utf-8"):
+        super().__init__(
+            filename,
+            mode="a",
+            maxBytes=maxBytes,
+            backupCount=backupCount,
+            encoding=encoding,
+        )
+        self._size = os.path.getsize(self.baseFilename)
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            if self.maxBytes > 0 and self._size + len(msg) > self.maxBytes:
+                self.doRollover()
+                self._size = 0
+            self.stream.write(msg)
+            self._size += len(msg)
+            if record.levelno >= logging.WARNING:
+                self.stream.flush()
+        except Exception:
+            self.handleError(record)
+
+
+@lru_cache(maxsize=None)
+def relative_path(pathname, pim_root):
+    """
+    Return pathname relative to pim_root when it lives inside it, memoized per source file.
+    """
+    full_path = Path(pathname).resolve()
+    if full_path.is_relative_to(pim_root):
+        return str(full_path.relative_to(pim_root))
+    return pathname
+
+
 class RelativePathFilter(logging.Filter):
     """
     A logging filter to add a 'relpath' attribute to log records.
@@ -58,8 +146,6 @@ class RelativePathFilter(logging.Filter):
         """Adds the 'relpath' attribute to the log record."""
         pathname = record.pathname
         if self.pim_root:
-            full_path = Path(pathname).resolve()
-            if full_path.is_relative_to(self.pim_root):
-                pathname = str(full_path.relative_to(self.pim_root))
+            pathname = relative_path(pathname, self.pim_root)
         record.relpath = pathname
         return True
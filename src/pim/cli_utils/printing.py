@@ -1,7 +1,12 @@
 import logging
 import sys
+import threading
+import time
 import traceback
+from rich.live import Live
+from rich.text import Text
 from pim.cli_utils.console import get_console, get_debug_mode
+from pim.config.config import PROGRESS_REFRESH_INTERVAL
 
 logger = logging.getLogger("pim")
 
@@ -25,6 +30,52 @@ def warning(message):
     get_console().print(f"[bold yellow]Warning:[/] {message}")
 
 
+class ProgressRenderer:
+    """
+    Rate-limited console progress for high frequency updates (e.g. per chunk downloads).
+    Updates from any thread only store the latest state per task, and the live display is
+    redrawn at most once every `interval` seconds. Intermediate states are dropped.
+    """
+
+    def __init__(self, interval=PROGRESS_REFRESH_INTERVAL):
+        self.interval = interval
+        self._tasks = {}
+        self._last_render = 0.0
+        self._lock = threading.Lock()
+        self._live = None
+
+    def update(self, task, message):
+        with self._lock:
+            self._tasks[task] = message
+            now = time.monotonic()
+            if now - self._last_render < self.interval:
+                return
+            self._last_render = now
+            self._render()
+
+    def finish(self, task, message=None):
+        """Remove a finished task, logging its final message once."""
+        with self._lock:
+            final_message = message or self._tasks.pop(task, None)
+            self._tasks.pop(task, None)
+            self._render()
+        if final_message:
+            debug(final_message)
+
+    def stop(self):
+        with self._lock:
+            if self._live is not None:
+                self._live.stop()
+                self._live = None
+
+    def _render(self):
+        # Caller holds the lock
+        if self._live is None:
+            self._live = Live(console=get_console(), auto_refresh=False)
+            self._live.start()
+        self._live.update(Text("\n".join(self._tasks.values())), refresh=True)
+
+
 def handle_cli_error(error, exit_code=1, message=None):
     console = get_console()
     debug = get_debug_mode()
@@ -1,4 +1,21 @@
+from pim.commands.bench import BenchCommand
+from pim.commands.cache import CacheCommand
+from pim.commands.daemon import DaemonCommand
 from pim.commands.install import InstallCommand
+from pim.commands.kernels import KernelsCommand
 from pim.commands.list import ListCommand
+from pim.commands.merge_manifests import MergeManifestsCommand
+from pim.commands.wait import WaitCommand
+from pim.commands.watch import WatchCommand
 
-__all__ = ["InstallCommand", "ListCommand"]
+__all__ = [
+    "BenchCommand",
+    "CacheCommand",
+    "DaemonCommand",
+    "InstallCommand",
+    "KernelsCommand",
+    "ListCommand",
+    "MergeManifestsCommand",
+    "WaitCommand",
+    "WatchCommand",
+]
@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+from pim.commands.base import BaseCommand
+from pim.commands.utils.benchmark import (
+    bench_target,
+    checkpoint_target,
+    resolve_bench_targets,
+)
+from pim.commands.utils.parsing import parse_pimfile
+from pim.utils.pathing import find_pimfile, validate_cache_volumes, validate_file_path
+from pim.cli_utils.printing import debug, success, handle_cli_error
+
+
+class BenchCommand(BaseCommand):
+    """
+    Measure how fast installed models load. Every load runs in a fresh
+    subprocess, once with the model's files dropped from the page cache
+    (cold) and once right after reading them (warm), and reports time to
+    first tensor, full load time, peak RSS and bytes read from storage.
+    """
+
+    name = "bench"
+    description = "Benchmark model load times with a cold and warm page cache"
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument(
+            "-f",
+            "--file",
+            default=None,
+            help="Path to the Pimfile, if not specified will walk up the directory tree to find it.",
+        )
+        self.parser.add_argument(
+            "--checkpoint",
+            action="append",
+            default=[],
+            help="Benchmark a checkpoint file or directory instead of the Pimfile models (repeatable)",
+        )
+        self.parser.add_argument(
+            "--cache-dir",
+            default=None,
+            help="Specify where the models are saved (default: ~/.pim/cache)",
+        )
+        self.parser.add_argument(
+            "--runs",
+            type=int,
+            default=1,
+            help="Number of cold and warm loads per model (default: 1)",
+        )
+        self.parser.add_argument(
+            "-o",
+            "--output",
+            default=None,
+            help="Write the JSON results to this file instead of stdout",
+        )
+
+    def run(self, args) -> int:
+        try:
+            if args.runs < 1:
+                raise ValueError("--runs must be at least 1")
+            cache_dir = validate_cache_volumes(args.cache_dir)[0]
+
+            if args.checkpoint:
+                targets = [checkpoint_target(path) for path in args.checkpoint]
+            else:
+                pimfile_path = (
+                    find_pimfile() if args.file is None else validate_file_path(args.file)
+                )
+                targets = resolve_bench_targets(parse_pimfile(pimfile_path), cache_dir)
+
+            results = []
+            for target in targets:
+                # Not printed with info, stdout may carry the JSON report
+                debug(f"Benchmarking {target['model']}")
+                results.append(bench_target(target, cache_dir, runs=args.runs))
+
+            report = json.dumps({"results": results}, indent=2)
+            if args.output:
+                Path(args.output).write_text(report)
+                success(f"Wrote benchmark results to {args.output}")
+            else:
+                print(report)
+            return 0
+        except Exception as e:
+            handle_cli_error(e)
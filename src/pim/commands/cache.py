@@ -0,0 +1,110 @@
+import subprocess
+import sys
+from pathlib import Path
+from pim.commands.base import BaseCommand
+from pim.config.config import COLD_STORAGE_IDLE_DAYS
+from pim.utils.cold_storage import compress_idle_models, restore_all_models, restore_model
+from pim.utils.pathing import validate_cache_volumes
+from pim.utils.volumes import (
+    rebalance_volumes,
+    register_cache_volumes,
+    remove_cache_volumes,
+)
+from pim.cli_utils.printing import info, warning, handle_cli_error
+
+
+class CacheCommand(BaseCommand):
+    """
+    Maintenance of the model cache.
+
+    - rebalance: spread striped model files across the configured cache
+      volumes, e.g. after adding a new volume with --cache-dir a:b:c.
+    - compress: recompress models unused for --idle-days (or the given
+      models) into seekable zstd. They are restored transparently the next
+      time they are installed.
+    - restore: decompress the given models, or every compressed model.
+    - remove-volume: move the striped files off the given volumes and stop using them.
+      Volumes are otherwise only ever added by --cache-dir.
+    """
+
+    name = "cache"
+    description = "Manage the model cache"
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument(
+            "action",
+            choices=["rebalance", "compress", "restore", "remove-volume"],
+            help="Cache operation to run",
+        )
+        self.parser.add_argument(
+            "models",
+            nargs="*",
+            help="Hugging Face models to compress or restore (default: idle / all compressed models), or volumes to remove",
+        )
+        self.parser.add_argument(
+            "--cache-dir",
+            default=None,
+            help="Cache volumes separated by ':' (default: PIM_CACHE_DIR or ~/.cache/pim)",
+        )
+        self.parser.add_argument(
+            "--idle-days",
+            type=float,
+            default=COLD_STORAGE_IDLE_DAYS,
+            help=f"Compress models unused for this many days (default: {COLD_STORAGE_IDLE_DAYS:g}, or PIM_COLD_AFTER_DAYS)",
+        )
+        self.parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Run the compression in a detached background process",
+        )
+
+    def run(self, args) -> int:
+        try:
+            primary = register_cache_volumes(validate_cache_volumes(args.cache_dir))
+            if args.action == "rebalance":
+                rebalance_volumes(primary)
+            elif args.action == "compress":
+                if args.background:
+                    start_background_compression(args)
+                else:
+                    compress_idle_models(primary, args.idle_days, args.models)
+            elif args.action == "restore":
+                if args.models:
+                    for model in args.models:
+                        if not restore_model(primary, "huggingface", model):
+                            warning(f"{model} is not compressed")
+                else:
+                    restore_all_models(primary)
+            elif args.action == "remove-volume":
+                if not args.models:
+                    raise ValueError("Give the cache volumes to remove")
+                remove_cache_volumes(
+                    primary, [Path(volume).resolve() for volume in args.models]
+                )
+            return 0
+        except Exception as e:
+            handle_cli_error(e)
+
+
+def start_background_compression(args):
+    command = [
+        sys.executable,
+        "-m",
+        "pim.cli_new",
+        "cache",
+        "compress",
+        *args.models,
+        "--idle-days",
+        str(args.idle_days),
+    ]
+    if args.cache_dir:
+        command += ["--cache-dir", args.cache_dir]
+    # Own session so the compression outlives the terminal it was started from
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    info(f"Compressing idle models in the background (pid {process.pid})")
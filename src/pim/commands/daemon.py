@@ -0,0 +1,37 @@
+from pim.commands.base import BaseCommand
+from pim.config.config import DAEMON_SOCKET_PATH, DAEMON_WORKERS
+from pim.cli_utils.printing import handle_cli_error
+
+
+class DaemonCommand(BaseCommand):
+    """
+    Run a long lived pim daemon that keeps imports, parsed Pimfiles, env
+    inventories and HTTP connections warm. While it is running, other pim
+    commands forward their work to it over a Unix socket.
+    """
+
+    name = "daemon"
+    description = "Run the pim daemon in the foreground"
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument(
+            "--socket",
+            default=str(DAEMON_SOCKET_PATH),
+            help=f"Unix socket to listen on (default: {DAEMON_SOCKET_PATH})",
+        )
+        self.parser.add_argument(
+            "--workers",
+            type=int,
+            default=DAEMON_WORKERS,
+            help=f"Number of concurrent install jobs (default: {DAEMON_WORKERS})",
+        )
+
+    def run(self, args) -> int:
+        try:
+            # Imported here so other commands never load the server side
+            from pim.daemon.server import serve
+
+            serve(args.socket, workers=args.workers)
+            return 0
+        except Exception as e:
+            handle_cli_error(e)
@@ -1,3 +1,4 @@
+import time
 from pim.config.config import DEFAULT_CONDA_ENV_NAME, DEFAULT_PYTHON_VERSION
 from pim.commands.base import BaseCommand
 from pim.utils.conda import (
@@ -11,9 +12,15 @@ from pim.commands.utils.parsing import (
     parse_models_list,
     parse_pimfile,
 )
-from pim.commands.utils.installers import install_models
-from pim.utils.pathing import find_pimfile, validate_cache_path, validate_file_path
+from pim.utils.pathing import (
+    find_pimfile,
+    validate_cache_volumes,
+    validate_file_path,
+)
+from pim.utils.journal import InstallJournal, get_journal_dir, install_run_id
+from pim.utils.volumes import register_cache_volumes
 from pim.cli_utils.printing import info, debug, success, warning, handle_cli_error
+from pim.daemon.client import call_daemon, daemon_available
 
 
 class InstallCommand(BaseCommand):
@@ -58,53 +65,194 @@ class InstallCommand(BaseCommand):
         self.parser.add_argument(
             "--cache-dir",
             default=None,
-            help="Specify where to save the models (default: ~/.pim/cache)",
+            help="Specify where to save the models (default: ~/.pim/cache). Separate several volumes with ':' to spread large files across them",
+        )
+        self.parser.add_argument(
+            "--shard",
+            default=None,
+            metavar="i/N",
+            help="Only install shard i of N (numbered from 0) of the model files, balanced by size. Combine the results with 'pim merge-manifests'",
+        )
+
+        self.parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted install of the same models from its journal, skipping completed steps",
+        )
+        self.parser.add_argument(
+            "--plan",
+            action="store_true",
+            help="Only print what would be downloaded, the disk space check and an estimated time",
         )
 
     def run(self, args) -> int:
         try:
-            cache_dir = validate_cache_path(args.cache_dir)
-            model_data_from_pimfile = None
-            model_data_from_user_args = None
-            # Check if models list is empty
-            if not args.models or args.file:
-                pimfile_path = (
-                    find_pimfile()
-                    if args.file is None
-                    else validate_file_path(args.file)
-                )
+            cache_dir = register_cache_volumes(validate_cache_volumes(args.cache_dir))
+            pimfile_path = resolve_pimfile_path(args.models, args.file)
+            if pimfile_path is not None:
                 info(
                     f"Installing models from {pimfile_path} and saving to {cache_dir}",
                     style="bold blue",
                 )
-                # TODO Update parser to handle dependencies too and python version
-                model_data_from_pimfile = parse_pimfile(pimfile_path)
 
-            if args.models:
-                debug(f"Models requested at CLI: {args.models}")
-                model_data_from_user_args = parse_models_list(args.models)
+            if args.plan:
+                from pim.commands.utils.planning import (
+                    build_install_plan,
+                    check_disk_space,
+                    print_plan,
+                )
 
-            # TODO Document struct more clearly
-            # Combine models into one dict
-            combined_model_data = combine_parsed_dicts(
-                model_data_from_pimfile, model_data_from_user_args
-            )
+                model_data = collect_model_data(args.models, pimfile_path)
+                plan = build_install_plan(model_data, cache_dir)
+                print_plan(plan)
+                check_disk_space(plan)
+                success("The install fits in the cache")
+                return 0
 
-            # TODO decide if we want to combine models into one dict -> Initial thought no if dependencies arent provided in cli but can be in Pimfile
-            if args.isolated:
-                info(
-                    "Using new isolated environments for all models provided!",
-                    style="bold yellow",
-                )
-                # TODO Handle isolated environments
-            else:
-                handle_conda_env_and_dependencies(
-                    combined_model_data.get("env-name", DEFAULT_CONDA_ENV_NAME),
-                    combined_model_data.get("conda-dependencies", None),
-                    combined_model_data.get("pip-dependencies", None),
+            if daemon_available():
+                # Paths are resolved here since the daemon does not share our cwd
+                info("Forwarding install to the pim daemon", style="bold blue")
+                result = call_daemon(
+                    "install",
+                    models=args.models,
+                    pimfile=str(pimfile_path) if pimfile_path else None,
+                    cache_dir=str(cache_dir),
+                    auth=args.auth,
+                    isolated=args.isolated,
+                    shard=args.shard,
+                    resume=args.resume,
                 )
+                success(f"Daemon finished installing {result['models']} models")
+                return 0
 
-                install_models(combined_model_data, cache_dir, args.auth)
+            combined_model_data = collect_model_data(args.models, pimfile_path)
+            run_install(
+                combined_model_data,
+                cache_dir,
+                auth=args.auth,
+                isolated=args.isolated,
+                shard=args.shard,
+                resume=args.resume,
+            )
+            return 0
 
         except Exception as e:
             handle_cli_error(e)
+
+
+def resolve_pimfile_path(models, file=None):
+    """
+    Return the Pimfile to install from, or None when only CLI models were requested.
+    """
+    if models and not file:
+        return None
+    return find_pimfile() if file is None else validate_file_path(file)
+
+
+def collect_model_data(models, pimfile_path, parse=parse_pimfile):
+    """
+    Build the combined model data from the Pimfile and the models requested at CLI.
+    `parse` lets callers holding a cache of parsed Pimfiles (e.g. the daemon) reuse it.
+    """
+    model_data_from_pimfile = None
+    model_data_from_user_args = None
+    if pimfile_path is not None:
+        # TODO Update parser to handle dependencies too and python version
+        model_data_from_pimfile = parse(pimfile_path)
+
+    if models:
+        debug(f"Models requested at CLI: {models}")
+        model_data_from_user_args = parse_models_list(models)
+
+    # TODO Document struct more clearly
+    # Combine models into one dict
+    return combine_parsed_dicts(model_data_from_pimfile, model_data_from_user_args)
+
+
+def run_install(
+    model_data,
+    cache_dir,
+    auth=False,
+    isolated=False,
+    shard=None,
+    resume=False,
+    on_ready=None,
+):
+    """
+    Set up the environment and install the models described by model_data.
+    Progress is journaled under <cache>/journals/, with resume an interrupted
+    install of the same model data continues from its last completed step.
+    on_ready(framework, model, model_dir) is called as each model becomes ready.
+    """
+    # Imported here so thin clients talking to the daemon never pay for torch/huggingface imports
+    from pim.commands.utils.installers import install_models
+    from pim.commands.utils.planning import (
+        build_install_plan,
+        check_disk_space,
+        record_throughput,
+    )
+    from pim.commands.utils.sharding import install_models_shard
+
+    # TODO decide if we want to combine models into one dict -> Initial thought no if dependencies arent provided in cli but can be in Pimfile
+    if shard:
+        # Sharded runs only populate the shared model cache, envs stay per node
+        install_models_shard(model_data, cache_dir, shard)
+    elif isolated:
+        info(
+            "Using new isolated environments for all models provided!",
+            style="bold yellow",
+        )
+        # TODO Handle isolated environments
+    else:
+        # Preflight: fail before any byte moves if the models cannot fit
+        plan = None
+        try:
+            plan = build_install_plan(model_data, cache_dir)
+        except Exception as e:
+            warning(f"Could not plan the install, skipping disk space check: {e}")
+        if plan is not None:
+            check_disk_space(plan)
+
+        journal = InstallJournal(
+            get_journal_dir(cache_dir) / f"{install_run_id(model_data, cache_dir)}.jsonl",
+            resume=resume,
+        )
+        error = None
+        try:
+            handle_conda_env_and_dependencies(
+                model_data.get("env-name", DEFAULT_CONDA_ENV_NAME),
+                model_data.get("conda-dependencies", None),
+                model_data.get("pip-dependencies", None),
+                journal=journal,
+                cache_dir=cache_dir,
+            )
+
+            started = time.monotonic()
+            model_sizes = None
+            if plan is not None:
+                # Reuse the sizes resolved for the plan to order the installs
+                model_sizes = {
+                    model: entry["total_bytes"]
+                    for model, entry in plan["models"].items()
+                }
+            install_models(
+                model_data,
+                cache_dir,
+                auth,
+                model_sizes=model_sizes,
+                on_ready=on_ready,
+                journal=journal,
+            )
+            if plan is not None and not journal.resumed:
+                # A resumed run only fetched part of the plan, its rate would be wrong
+                record_throughput(plan["fetch_bytes"], time.monotonic() - started)
+        except BaseException as e:
+            # BaseException: an interrupted run (Ctrl-C) still leaves its summary
+            error = e
+            raise
+        finally:
+            journal.close()
+            summary_path = journal.write_summary(error)
+            info(f"Install summary written to {summary_path}")
+            if error is not None:
+                info("Run 'pim install --resume' with the same arguments to continue")
@@ -0,0 +1,56 @@
+from pim.commands.base import BaseCommand
+from pim.config.config import DEFAULT_CONDA_ENV_NAME, ISOLATED_ENV_PREFIX
+from pim.utils.conda import list_conda_envs
+from pim.utils.jupyter_util import get_kernels_dir, sync_jupyter_kernels
+from pim.cli_utils.printing import info, success, handle_cli_error
+
+
+class KernelsCommand(BaseCommand):
+    """
+    Register pim's conda environments as Jupyter kernels by writing their
+    kernel specs directly. Running it again only changes what is out of
+    date, and kernels of deleted environments are removed.
+    """
+
+    name = "kernels"
+    description = "Sync Jupyter kernels with pim's conda environments"
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument(
+            "--env",
+            action="append",
+            default=[],
+            help=f"Environment to register (repeatable, default: {DEFAULT_CONDA_ENV_NAME} and isolated envs)",
+        )
+        self.parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Also remove pim kernels of environments not being registered",
+        )
+
+    def run(self, args) -> int:
+        try:
+            all_envs = list_conda_envs()
+            if args.env:
+                missing = [env for env in args.env if env not in all_envs]
+                if missing:
+                    raise ValueError(f"Conda environments not found: {', '.join(missing)}")
+                envs = {env: all_envs[env] for env in args.env}
+            else:
+                envs = {
+                    name: prefix
+                    for name, prefix in all_envs.items()
+                    if name == DEFAULT_CONDA_ENV_NAME
+                    or name.startswith(ISOLATED_ENV_PREFIX)
+                }
+
+            result = sync_jupyter_kernels(envs, prune=args.prune)
+            for action in ("added", "updated", "removed"):
+                for name in result[action]:
+                    info(f"  {action}: {name}")
+            success(
+                f"Jupyter kernels in sync ({len(result['unchanged'])} unchanged) in {get_kernels_dir()}"
+            )
+            return 0
+        except Exception as e:
+            handle_cli_error(e)
@@ -1,6 +1,9 @@
-from pathlib import Path
 from pim.commands.base import BaseCommand
-from pim.cli_utils.printing import handle_cli_error
+from pim.commands.utils.parsing import parse_pimfile
+from pim.config.config import SUPPORTED_FRAMEWORKS
+from pim.daemon.client import call_daemon, daemon_available
+from pim.utils.pathing import validate_file_path
+from pim.cli_utils.printing import info, handle_cli_error
 
 
 class ListCommand(BaseCommand):
@@ -17,8 +20,21 @@ class ListCommand(BaseCommand):
 
     def run(self, args) -> int:
         try:
-            # pimfile_path = Path(args.file)
-            # ...existing list logic...
+            pimfile_path = validate_file_path(args.file)
+            if daemon_available():
+                models_to_list = call_daemon("list", pimfile=str(pimfile_path))
+            else:
+                models_to_list = parse_pimfile(pimfile_path)
+
+            info(f"Models declared in {pimfile_path}:\n")
+            for framework in sorted(SUPPORTED_FRAMEWORKS):
+                models = models_to_list.get(framework, [])
+                info(f"  {framework}:")
+                if models:
+                    for model in models:
+                        info(f"    - {model}")
+                else:
+                    info("    (no models specified)")
             return 0
         except Exception as e:
             handle_cli_error(e)
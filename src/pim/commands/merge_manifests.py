@@ -0,0 +1,32 @@
+from pim.commands.base import BaseCommand
+from pim.utils.pathing import validate_cache_path
+from pim.cli_utils.printing import success, handle_cli_error
+
+
+class MergeManifestsCommand(BaseCommand):
+    """
+    Combine the partial manifests written by 'pim install --shard i/N'
+    workers into a single manifest for the shared cache.
+    """
+
+    name = "merge-manifests"
+    description = "Merge partial manifests from sharded installs"
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument(
+            "--cache-dir",
+            default=None,
+            help="Cache directory the shards installed into (default: ~/.pim/cache)",
+        )
+
+    def run(self, args) -> int:
+        try:
+            # Imported here so other commands never pay for the huggingface_hub import
+            from pim.commands.utils.sharding import merge_manifests
+
+            cache_dir = validate_cache_path(args.cache_dir)
+            merged_path = merge_manifests(cache_dir)
+            success(f"Manifest written to {merged_path}")
+            return 0
+        except Exception as e:
+            handle_cli_error(e)
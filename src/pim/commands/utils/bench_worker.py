@@ -0,0 +1,145 @@
+"""
+Load one model in a fresh process and report load metrics as JSON on stdout.
+Spawned by 'pim bench', one process per run so every load starts cold in Python.
+
+    python -m pim.commands.utils.bench_worker --kind checkpoint --target model.safetensors
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from pathlib import Path
+
+_IMPORT_STARTED = time.perf_counter()
+import torch  # noqa: E402
+
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+CHECKPOINT_SUFFIXES = (".safetensors", ".bin", ".pth", ".pt")
+
+
+def read_io_counters():
+    """Return (bytes read from storage, bytes read through syscalls), None where unsupported."""
+    try:
+        with open("/proc/self/io", "r") as f:
+            counters = dict(line.split(": ") for line in f.read().splitlines())
+        return int(counters["read_bytes"]), int(counters["rchar"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def find_checkpoints(target):
+    target = Path(target)
+    if target.is_file():
+        return [target]
+    files = [p for p in sorted(target.rglob("*")) if p.name.endswith(CHECKPOINT_SUFFIXES)]
+    # Prefer safetensors when a model ships both formats, like the HF loaders do
+    safetensors = [p for p in files if p.suffix == ".safetensors"]
+    return safetensors or files
+
+
+def first_tensor(checkpoint):
+    """Materialize the first tensor of a checkpoint as cheaply as the format allows."""
+    if checkpoint.suffix == ".safetensors":
+        from safetensors import safe_open
+
+        with safe_open(str(checkpoint), framework="pt", device="cpu") as f:
+            keys = list(f.keys())
+            return f.get_tensor(keys[0]) if keys else None
+    state = torch.load(checkpoint, map_location="cpu", mmap=True, weights_only=True)
+    for value in state.values():
+        if isinstance(value, torch.Tensor):
+            return value
+    return None
+
+
+def load_checkpoints(checkpoints):
+    """Fully load every tensor of the checkpoints into memory."""
+    tensors = {}
+    for checkpoint in checkpoints:
+        if checkpoint.suffix == ".safetensors":
+            from safetensors.torch import load_file
+
+            tensors.update(load_file(str(checkpoint), device="cpu"))
+        else:
+            tensors.update(
+                torch.load(checkpoint, map_location="cpu", weights_only=True)
+            )
+    # Touch every tensor so lazily mapped pages are actually read
+    for tensor in tensors.values():
+        if isinstance(tensor, torch.Tensor) and tensor.numel():
+            tensor.flatten()[-1].item()
+    return tensors
+
+
+def load_model(kind, target, cache_dir=None):
+    if kind == "torch":
+        from pim.commands.utils.installers import (
+            get_torchvision_model,
+            set_torch_cache_dir,
+        )
+
+        if cache_dir:
+            set_torch_cache_dir(cache_dir)
+        return get_torchvision_model(target, pretrained=True)
+    if kind == "huggingface":
+        if (Path(target) / "config.json").exists():
+            try:
+                from transformers import AutoModel
+
+                return AutoModel.from_pretrained(target)
+            except ImportError:
+                pass
+        return load_checkpoints(find_checkpoints(target))
+    return load_checkpoints(find_checkpoints(target))
+
+
+def run(kind, target, cache_dir=None):
+    read_before, rchar_before = read_io_counters()
+    started = time.perf_counter()
+
+    time_to_first_tensor = None
+    if kind != "torch":
+        checkpoints = find_checkpoints(target)
+        if checkpoints and first_tensor(checkpoints[0]) is not None:
+            time_to_first_tensor = time.perf_counter() - started
+
+    load_model(kind, target, cache_dir)
+    load_seconds = time.perf_counter() - started
+    if time_to_first_tensor is None:
+        # Loaders that do not expose tensors early only report the full load
+        time_to_first_tensor = load_seconds
+
+    read_after, rchar_after = read_io_counters()
+    return {
+        "import_seconds": IMPORT_SECONDS,
+        "time_to_first_tensor_seconds": time_to_first_tensor,
+        "load_seconds": load_seconds,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "bytes_read": None if read_before is None else read_after - read_before,
+        "bytes_requested": None if rchar_before is None else rchar_after - rchar_before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kind", choices=["checkpoint", "huggingface", "torch"])
+    parser.add_argument("--target", required=True)
+    parser.add_argument("--cache-dir", default=None)
+    args = parser.parse_args()
+    # Use every core for CPU loads, accelerators are hidden by the parent (see benchmark.run_worker)
+    torch.set_num_threads(os.cpu_count() or 1)
+    print(json.dumps(run(args.kind, args.target, args.cache_dir)))
+
+
+if __name__ == "__main__":
+    main()
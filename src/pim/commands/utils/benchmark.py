@@ -0,0 +1,158 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from pim.cli_utils.printing import debug, warning
+from pim.utils.cold_storage import restore_model
+
+BENCH_WORKER_MODULE = "pim.commands.utils.bench_worker"
+READ_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def iter_files(paths):
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            yield from (p for p in path.rglob("*") if p.is_file())
+        elif path.is_file():
+            yield path
+
+
+def drop_page_cache(paths):
+    """
+    Ask the kernel to evict the files from the page cache so the next read hits the disk.
+    POSIX_FADV_DONTNEED needs no privileges but only drops clean pages of these files.
+    Returns False where fadvise is unavailable, in which case 'cold' runs are best effort.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    for path in iter_files(paths):
+        # Resolve symlinks so the advice reaches the HF blob or striped file
+        fd = os.open(path.resolve(), os.O_RDONLY)
+        try:
+            os.fdatasync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+
+def warm_page_cache(paths):
+    """Read the files once so the next load is served from the page cache."""
+    for path in iter_files(paths):
+        with open(path.resolve(), "rb", buffering=0) as f:
+            while f.read(READ_CHUNK_BYTES):
+                pass
+
+
+def resolve_bench_targets(model_data, cache_dir):
+    """
+    Return the installed models of a parsed Pimfile as bench targets.
+    Each target has the worker kind, what the worker loads and the files backing it.
+    Models that are not installed are skipped with a warning.
+    """
+    targets = []
+    for model in model_data.get("huggingface", []):
+        from huggingface_hub import snapshot_download
+
+        restore_model(cache_dir, "huggingface", model)
+        try:
+            snapshot_dir = snapshot_download(
+                model, cache_dir=cache_dir, local_files_only=True
+            )
+        except Exception:
+            warning(f"{model} is not installed in {cache_dir}, skipping")
+            continue
+        targets.append(
+            {
+                "framework": "huggingface",
+                "model": model,
+                "kind": "huggingface",
+                "target": snapshot_dir,
+                "files": [snapshot_dir],
+            }
+        )
+
+    # torchvision names its weight files after the weights, not the model,
+    # so every cached checkpoint is dropped or warmed along with the model
+    torch_checkpoints = Path(cache_dir) / "hub" / "checkpoints"
+    for model in model_data.get("torch", []):
+        targets.append(
+            {
+                "framework": "torch",
+                "model": model,
+                "kind": "torch",
+                "target": model,
+                "files": [torch_checkpoints],
+            }
+        )
+
+    for framework in ("sklearn", "custom"):
+        for model in model_data.get(framework, []):
+            warning(f"Benchmarking {framework} models is not supported, skipping {model}")
+    return targets
+
+
+def checkpoint_target(path):
+    path = Path(path).resolve()
+    if not path.exists():
+        raise FileNotFoundError(f"Checkpoint not found: {path}")
+    return {
+        "framework": "checkpoint",
+        "model": path.name,
+        "kind": "checkpoint",
+        "target": str(path),
+        "files": [path],
+    }
+
+
+def run_worker(target, cache_dir=None):
+    """
+    Load the target in a fresh interpreter and return the metrics it reports.
+    """
+    command = [
+        sys.executable,
+        "-m",
+        BENCH_WORKER_MODULE,
+        "--kind",
+        target["kind"],
+        "--target",
+        str(target["target"]),
+    ]
+    if cache_dir:
+        command += ["--cache-dir", str(cache_dir)]
+    # Hide accelerators so loads are measured on CPU only
+    env = {**os.environ, "CUDA_VISIBLE_DEVICES": ""}
+    result = subprocess.run(command, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"Loading {target['model']} failed:\n{result.stderr.strip()}"
+        )
+    # The worker prints its metrics as the last line, loaders may print before it
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def bench_target(target, cache_dir=None, runs=1):
+    """
+    Benchmark one target with a cold and a warm page cache, `runs` times each.
+    """
+    results = {"cold": [], "warm": []}
+    for run in range(runs):
+        dropped = drop_page_cache(target["files"])
+        if not dropped and run == 0:
+            warning("posix_fadvise is unavailable, cold runs may hit the page cache")
+        results["cold"].append(run_worker(target, cache_dir))
+        debug(f"{target['model']} cold run {run + 1}: {results['cold'][-1]}")
+
+        warm_page_cache(target["files"])
+        results["warm"].append(run_worker(target, cache_dir))
+        debug(f"{target['model']} warm run {run + 1}: {results['warm'][-1]}")
+
+    return {
+        "framework": target["framework"],
+        "model": target["model"],
+        "target": str(target["target"]),
+        **results,
+    }
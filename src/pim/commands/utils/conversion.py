@@ -0,0 +1,198 @@
+import json
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import torch
+from safetensors.torch import save_file
+
+from pim.cli_utils.printing import debug, info, success, warning
+from pim.config.config import CONVERSION_WORKERS, DEFAULT_CACHE_DIR, DERIVED_DIR_NAME
+from pim.utils.package_cache import file_sha256
+
+SUPPORTED_CONVERSIONS = {"safetensors"}
+
+# Pickle based checkpoint formats that can be converted
+PICKLE_CHECKPOINT_SUFFIXES = (".bin", ".pth", ".pt")
+
+# One pool for the whole process, models installed concurrently share it
+_pool = None
+_pool_lock = threading.Lock()
+# Conversions in flight by artifact, so two models sharing a checkpoint convert it once
+_in_flight = {}
+
+
+def source_hash(path):
+    """
+    Return the sha256 of a checkpoint file.
+    Hugging Face cache snapshots are symlinks to blobs named by their sha256, so reuse that when possible.
+    """
+    path = Path(path)
+    if path.is_symlink():
+        blob_name = Path(os.readlink(path)).name
+        if re.fullmatch(r"[0-9a-f]{64}", blob_name):
+            return blob_name
+    return file_sha256(path)
+
+
+def safetensors_name(checkpoint_name):
+    """
+    Map a pickle checkpoint file name to its safetensors equivalent,
+    following the Hugging Face convention of pytorch_model*.bin -> model*.safetensors.
+    """
+    stem = checkpoint_name.rsplit(".", 1)[0]
+    if stem.startswith("pytorch_model"):
+        stem = "model" + stem[len("pytorch_model") :]
+    return f"{stem}.safetensors"
+
+
+def extract_state_dict(checkpoint):
+    """
+    Return the flat tensor dict stored in a loaded checkpoint.
+    Training checkpoints often nest the weights under 'state_dict' or 'model'.
+    """
+    if isinstance(checkpoint, dict):
+        if all(isinstance(value, torch.Tensor) for value in checkpoint.values()):
+            return checkpoint
+        for key in ("state_dict", "model"):
+            if isinstance(checkpoint.get(key), dict):
+                return extract_state_dict(checkpoint[key])
+    raise ValueError("Checkpoint does not contain a plain tensor state dict")
+
+
+def convert_checkpoint(checkpoint_path, output_path):
+    """
+    Convert a single pickle checkpoint to safetensors. Runs inside a worker process.
+    """
+    checkpoint = torch.load(checkpoint_path, map_location="cpu", weights_only=True)
+    state_dict = extract_state_dict(checkpoint)
+
+    # safetensors refuses tensors sharing storage (e.g. tied embeddings), so copy those
+    seen_storage = set()
+    tensors = {}
+    for name, tensor in state_dict.items():
+        storage = tensor.untyped_storage().data_ptr()
+        if storage in seen_storage:
+            tensor = tensor.clone()
+        seen_storage.add(storage)
+        tensors[name] = tensor.contiguous()
+
+    partial_path = Path(f"{output_path}.partial")
+    save_file(tensors, str(partial_path), metadata={"format": "pt"})
+    os.replace(partial_path, output_path)
+    return str(output_path)
+
+
+def find_pickle_checkpoints(model_dir):
+    return sorted(
+        path
+        for path in Path(model_dir).rglob("*")
+        if path.is_file() and path.name.endswith(PICKLE_CHECKPOINT_SUFFIXES)
+    )
+
+
+def convert_index_file(model_dir):
+    """
+    Write model.safetensors.index.json next to a sharded pytorch_model.bin.index.json
+    so loaders pick up the converted shards.
+    """
+    index_path = Path(model_dir) / "pytorch_model.bin.index.json"
+    target_path = Path(model_dir) / "model.safetensors.index.json"
+    if not index_path.exists() or target_path.exists():
+        return
+
+    with open(index_path, "r") as f:
+        index = json.load(f)
+    index["weight_map"] = {
+        tensor: safetensors_name(shard)
+        for tensor, shard in index.get("weight_map", {}).items()
+    }
+    # Only publish the index once every shard it points to was converted
+    shards = set(index["weight_map"].values())
+    if not all((Path(model_dir) / shard).exists() for shard in shards):
+        return
+    with open(target_path, "w") as f:
+        json.dump(index, f, indent=2)
+
+
+def get_derived_dir(cache_dir=None):
+    return Path(cache_dir or DEFAULT_CACHE_DIR) / DERIVED_DIR_NAME
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs install threads can deadlock the children
+        _pool = ProcessPoolExecutor(
+            max_workers=CONVERSION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def submit_conversion(checkpoint, artifact):
+    with _pool_lock:
+        future = _in_flight.get(artifact)
+        if future is None:
+            future = _get_pool().submit(convert_checkpoint, str(checkpoint), str(artifact))
+            _in_flight[artifact] = future
+            future.add_done_callback(lambda _: _in_flight.pop(artifact, None))
+        return future
+
+
+def convert_models_to_safetensors(model_dirs, cache_dir=None):
+    """
+    Convert every pickle checkpoint found in model_dirs to safetensors in the shared pool
+    of worker processes.
+
+    Converted files are stored once in the derived cache of cache_dir, keyed by the hash of
+    their source, and linked next to the original checkpoint. Already converted checkpoints
+    are skipped.
+    """
+    derived_dir = get_derived_dir(cache_dir) / "safetensors"
+    derived_dir.mkdir(parents=True, exist_ok=True)
+
+    # (checkpoint, derived artifact, link placed next to the checkpoint)
+    jobs = []
+    for model_dir in model_dirs:
+        for checkpoint in find_pickle_checkpoints(model_dir):
+            link_path = checkpoint.parent / safetensors_name(checkpoint.name)
+            if link_path.exists():
+                debug(f"Skipping {checkpoint}, {link_path.name} already exists")
+                continue
+            artifact = derived_dir / f"{source_hash(checkpoint)}.safetensors"
+            jobs.append((checkpoint, artifact, link_path))
+
+    # Identical checkpoints across models share one artifact, convert it once
+    pending = {}
+    for checkpoint, artifact, _ in jobs:
+        if not artifact.exists():
+            pending.setdefault(artifact, checkpoint)
+
+    if pending:
+        info(f"Converting {len(pending)} checkpoints to safetensors")
+        futures = {
+            submit_conversion(checkpoint, artifact): checkpoint
+            for artifact, checkpoint in pending.items()
+        }
+        for future, checkpoint in futures.items():
+            try:
+                future.result()
+                debug(f"Converted {checkpoint}")
+            except Exception as e:
+                warning(f"Could not convert {checkpoint} to safetensors: {e}")
+
+    converted = 0
+    for checkpoint, artifact, link_path in jobs:
+        if artifact.exists():
+            link_path.symlink_to(artifact)
+            converted += 1
+
+    for model_dir in model_dirs:
+        convert_index_file(model_dir)
+
+    if converted:
+        success(f"Safetensors weights available for {converted} checkpoints")
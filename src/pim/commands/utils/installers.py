@@ -1,30 +1,218 @@
-import os
 import inspect
+import threading
+import torch
 import torchvision.models as torchvision_models
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from pim.cli_utils.printing import warning
-from huggingface_hub import snapshot_download
+from pim.cli_utils.printing import ProgressRenderer, debug, info, warning
+from pim.commands.utils.conversion import (
+    SUPPORTED_CONVERSIONS,
+    convert_models_to_safetensors,
+)
+from pim.commands.utils.parsing import PIMFILE_METADATA_KEYS
+from pim.commands.utils.sharding import resolve_model_files, write_refs_main
+from pim.config.config import INSTALL_WORKERS
+from pim.utils.cold_storage import record_model_use, restore_model
+from pim.utils.journal import check_cancelled, run_step
+from pim.utils.package_cache import file_sha256
+from pim.utils.readiness import mark_ready
+from pim.utils.volumes import VolumeIndex, place_files, replace_symlink, stripe_dir
+from huggingface_hub import hf_hub_download, snapshot_download
+from huggingface_hub.file_download import repo_folder_name
 
+# Shared by every concurrent model install, so parallel file downloads redraw one display
+_progress = ProgressRenderer()
 
-def install_models(model_data, cache_dir=None, auth=None):
+
+def install_models(
+    model_data, cache_dir=None, auth=None, model_sizes=None, on_ready=None, journal=None
+):
     """
     Install models based on the provided model data.
-    This function should handle the installation logic for each supported framework.
+
+    Models are installed concurrently, started in priority order (see order_install_jobs),
+    and each one is published with a ready marker as soon as it is complete, so processes
+    that only need a small model do not wait for the largest download.
+    on_ready(framework, model, model_dir) is called for each model as it becomes ready.
+    With an install journal, models and files completed by an interrupted run are skipped.
+    If the install is interrupted, every model stops before its next file download.
     """
     if not model_data:
         raise ValueError("No model data provided for installation.")
 
-    for framework, models in model_data.items():
-        if framework == "huggingface":
-            install_huggingface(models, cache_dir, use_auth=auth)
-        elif framework == "torchvision":
-            install_torchvision(models, cache_dir)
-        elif framework == "sklearn":
-            install_sklearn(models, cache_dir)
-        elif framework == "custom":
-            install_custom(models, cache_dir)
-        else:
-            warning(f"Unsupported framework: {framework}")
+    model_options = model_data.get("model-options", {})
+    jobs = order_install_jobs(model_data, model_sizes)
+    # KeyboardInterrupt only reaches this thread, the download threads poll this instead
+    cancel = threading.Event()
+    # One index shared by every model, each save then holds the placements of all of them
+    volume_index = VolumeIndex(cache_dir) if cache_dir is not None else None
+    if cache_dir is not None and model_data.get("torch"):
+        # Process wide setting, so made once here rather than from the install threads
+        set_torch_cache_dir(cache_dir)
+
+    def install_and_convert(framework, model):
+        model_dir = install_model(
+            framework, model, cache_dir, auth, journal, cancel, volume_index
+        )
+        if model_dir is not None:
+            # Conversions are part of the install, a model is not ready before them
+            run_post_install_conversions(
+                {(framework, model): model_dir}, model_options, cache_dir
+            )
+        return {"path": str(model_dir) if model_dir is not None else None}
+
+    def install_one(job):
+        framework, model = job
+        if framework == "huggingface" and cache_dir is not None:
+            # Requested again: bring it back from cold storage before checking the files
+            restore_model(cache_dir, framework, model)
+        # Failed files are retried inside the step, the model step itself is not
+        installed = run_step(
+            journal,
+            f"model-installed:{framework}:{model}",
+            lambda: install_and_convert(framework, model),
+            retries=0,
+            cancel=cancel,
+        )
+        return Path(installed["path"]) if installed.get("path") else None
+
+    failures = []
+    try:
+        with ThreadPoolExecutor(max_workers=INSTALL_WORKERS) as executor:
+            # The pool starts jobs in submission order, so higher priority models go first
+            futures = {executor.submit(install_one, job): job for job in jobs}
+            try:
+                for future in as_completed(futures):
+                    framework, model = futures[future]
+                    try:
+                        model_dir = future.result()
+                    except Exception as e:
+                        warning(f"Failed to install {framework}:{model}: {e}")
+                        failures.append((framework, model, e))
+                        continue
+                    if model_dir is None:
+                        warning(
+                            f"Installing {framework} models is not supported yet, skipped {model}"
+                        )
+                        continue
+                    if cache_dir is not None:
+                        mark_ready(cache_dir, framework, model, model_dir)
+                        record_model_use(cache_dir, framework, model)
+                    info(f"{framework}:{model} is ready")
+                    if on_ready is not None:
+                        on_ready(framework, model, model_dir)
+            except BaseException:
+                # Ctrl-C or a failing callback: drop queued models and stop the running
+                # ones before their next file, only the downloads in progress finish
+                cancel.set()
+                executor.shutdown(cancel_futures=True)
+                raise
+    finally:
+        _progress.stop()
+
+    if failures:
+        names = ", ".join(f"{framework}:{model}" for framework, model, _ in failures)
+        raise RuntimeError(f"Failed to install {names}") from failures[0][2]
+
+
+def install_model(
+    framework,
+    model,
+    cache_dir=None,
+    auth=None,
+    journal=None,
+    cancel=None,
+    volume_index=None,
+):
+    """
+    Install a single model. Returns its local directory, or None if the
+    framework installer does not produce one yet.
+    """
+    if framework == "huggingface":
+        return install_huggingface(
+            [model],
+            cache_dir,
+            use_auth=auth,
+            journal=journal,
+            cancel=cancel,
+            volume_index=volume_index,
+        )[model]
+    elif framework == "torch":
+        return install_torchvision([model], cache_dir)
+    elif framework == "sklearn":
+        return install_sklearn([model], cache_dir)
+    elif framework == "custom":
+        return install_custom([model], cache_dir)
+    warning(f"Unsupported framework: {framework}")
+    return None
+
+
+def get_model_priority(model_options, framework, model):
+    priority = model_options.get(framework, {}).get(model, {}).get("priority", 0)
+    if isinstance(priority, bool) or not isinstance(priority, int):
+        raise ValueError(f"Priority of {model} must be an integer, got {priority!r}")
+    return priority
+
+
+def resolve_model_sizes(model_data):
+    """
+    Return {model: total bytes} for the models whose size can be looked up.
+    """
+    hf_models = model_data.get("huggingface", [])
+    if not hf_models:
+        return {}
+    try:
+        # Only Hugging Face models have remote sizes to look up
+        files = resolve_model_files({"huggingface": hf_models})
+    except Exception as e:
+        debug(f"Could not resolve model sizes, ordering by priority only: {e}")
+        return {}
+    sizes = {}
+    for entry in files:
+        sizes[entry["model"]] = sizes.get(entry["model"], 0) + entry["size"]
+    return sizes
+
+
+def order_install_jobs(model_data, model_sizes=None):
+    """
+    Return the (framework, model) pairs to install, highest 'priority' first
+    (default 0) and smallest first within a priority, so quick models are
+    published early. Ties keep the Pimfile order.
+    """
+    model_options = model_data.get("model-options", {})
+    jobs = [
+        (framework, model)
+        for framework, models in model_data.items()
+        if framework not in PIMFILE_METADATA_KEYS
+        for model in models
+    ]
+    if model_sizes is None:
+        model_sizes = resolve_model_sizes(model_data)
+    return sorted(
+        jobs,
+        key=lambda job: (
+            -get_model_priority(model_options, *job),
+            model_sizes.get(job[1], 0),
+        ),
+    )
+
+
+def run_post_install_conversions(installed_dirs, model_options, cache_dir=None):
+    """
+    Run the optional per model 'convert' stage declared in the Pimfile on installed models.
+    """
+    to_convert = []
+    for (framework, model), model_dir in installed_dirs.items():
+        conversion = model_options.get(framework, {}).get(model, {}).get("convert")
+        if conversion is None:
+            continue
+        if conversion not in SUPPORTED_CONVERSIONS:
+            warning(f"Unsupported conversion '{conversion}' for {model}, skipping")
+            continue
+        to_convert.append(model_dir)
+
+    if to_convert:
+        convert_models_to_safetensors(to_convert, cache_dir)
 
 
 def install_sklearn(models, cache_dir=None):
@@ -43,52 +231,231 @@ def install_custom(models, cache_dir=None):
 
 def install_torchvision(models, cache_dir=None):
     """
-    Install torchvision models.
+    Install torchvision models by downloading their default pretrained weights.
+    Returns the torch hub checkpoints directory the weights are stored in.
+    The torch hub directory must already point at the cache, see set_torch_cache_dir.
     """
-    return
+    for model in models:
+        get_torchvision_model(model, pretrained=True)
+    # <cache>/hub/checkpoints once set_torch_cache_dir ran
+    return Path(torch.hub.get_dir()) / "checkpoints"
 
 
-def install_huggingface(models, cache_dir=None, use_auth=None):
+def install_huggingface(
+    models, cache_dir=None, use_auth=None, journal=None, cancel=None, volume_index=None
+):
     """
     Install Hugging Face models.
+    Returns a dict mapping each model to its local snapshot directory.
+    With an install journal, files are fetched and verified one by one so an
+    interrupted install resumes at file granularity.
+    Setting the cancel event stops the install before its next file.
+    Concurrent installs into one cache must share volume_index (see
+    install_huggingface_striped).
     """
     # TODO Handle auth
+    if volume_index is None and cache_dir:
+        volume_index = VolumeIndex(cache_dir)
+    volumes = volume_index.volumes if volume_index is not None else []
+    model_dirs = {}
     for model in models:
-        snapshot_download(model["name"])
+        if len(volumes) > 1:
+            model_dirs[model] = install_huggingface_striped(
+                model, volume_index, journal, cancel
+            )
+        elif journal is not None:
+            model_dirs[model] = install_huggingface_files(
+                model, cache_dir, journal, cancel
+            )
+        else:
+            check_cancelled(cancel, f"downloading {model}")
+            model_dirs[model] = Path(snapshot_download(model, cache_dir=cache_dir))
+    return model_dirs
 
 
-def get_torchvision_model(name, pretrained=True, cache_dir=None):
+def verify_model_file(path, entry):
     """
-    Load a torchvision model with optional pretrained weights and a custom cache directory.
+    Check a downloaded file against its remote size and, for LFS files, its sha256.
+    A corrupt file is removed so the retry downloads it again.
+    """
+    path = Path(path).resolve()
+    size = path.stat().st_size
+    if entry["size"] and size != entry["size"]:
+        path.unlink()
+        raise OSError(
+            f"{entry['model']}/{entry['file']} is {size} bytes, expected {entry['size']}"
+        )
+    if entry.get("sha256") and file_sha256(path) != entry["sha256"]:
+        path.unlink()
+        raise OSError(f"{entry['model']}/{entry['file']} failed its checksum")
+
+
+def track_files(model, files):
+    """
+    Return a callback that reports each fetched file of model to the shared progress display.
+    Safe to call from the download threads, the display is redrawn at a bounded rate.
+    """
+    total_bytes = sum(entry["size"] for entry in files)
+    done = {"files": 0, "bytes": 0}
+    lock = threading.Lock()
+
+    def advance(entry):
+        with lock:
+            done["files"] += 1
+            done["bytes"] += entry["size"]
+            message = (
+                f"{model}: {done['files']}/{len(files)} files, "
+                f"{done['bytes'] / 1e6:.1f}/{total_bytes / 1e6:.1f} MB"
+            )
+            finished = done["files"] == len(files)
+        if finished:
+            _progress.finish(model, message)
+        else:
+            _progress.update(model, message)
+
+    return advance
+
+
+def map_cancellable(executor, fn, items):
+    """
+    Like list(executor.map(fn, items)), but the calls still queued are cancelled
+    as soon as one fails or the caller is interrupted, instead of all running first.
+    """
+    try:
+        return list(executor.map(fn, items))
+    except BaseException:
+        executor.shutdown(cancel_futures=True)
+        raise
+
+
+def file_step(entry):
+    return f"file-fetched:huggingface:{entry['model']}@{entry['revision']}:{entry['file']}"
+
+
+def install_huggingface_files(model, cache_dir, journal, cancel=None):
+    """
+    Install a Hugging Face model file by file, each one a journaled and verified step.
+    """
+    files = resolve_model_files({"huggingface": [model]})
+    revision = files[0]["revision"] if files else "main"
+    repo_folder = repo_folder_name(repo_id=model, repo_type="model")
+    advance = track_files(model, files)
+
+    def fetch(entry):
+        def fetch_and_verify():
+            stored = hf_hub_download(
+                model, entry["file"], revision=revision, cache_dir=cache_dir
+            )
+            verify_model_file(stored, entry)
+
+        run_step(
+            journal,
+            file_step(entry),
+            fetch_and_verify,
+            cancel=cancel,
+            size=entry["size"],
+        )
+        advance(entry)
+
+    with ThreadPoolExecutor(max_workers=INSTALL_WORKERS) as executor:
+        map_cancellable(executor, fetch, files)
+
+    write_refs_main(cache_dir, repo_folder, revision)
+    return Path(cache_dir) / repo_folder / "snapshots" / revision
+
+
+def install_huggingface_striped(model, index, journal=None, cancel=None):
+    """
+    Install a Hugging Face model with its large files spread across several cache volumes.
+
+    The primary volume keeps the regular Hugging Face cache layout, so loaders only need
+    the primary cache_dir. Large files are downloaded in parallel onto the volume chosen by
+    place_files and linked into the primary snapshot, small files stay on the primary.
+    index is the VolumeIndex of the cache. Each save writes the whole index, so models
+    installed at the same time must record into the same instance.
+    """
+    primary = index.primary
+    volumes = index.volumes
+    files = resolve_model_files({"huggingface": [model]})
+    revision = files[0]["revision"] if files else "main"
+    placement = place_files([(f["file"], f["size"]) for f in files], volumes)
+
+    repo_folder = repo_folder_name(repo_id=model, repo_type="model")
+    snapshot_dir = primary / repo_folder / "snapshots" / revision
+    advance = track_files(model, files)
+
+    def fetch_and_verify(entry):
+        volume = placement[entry["file"]]
+        if volume is None:
+            stored = hf_hub_download(
+                model, entry["file"], revision=revision, cache_dir=primary
+            )
+            verify_model_file(stored, entry)
+            return
+        stored = hf_hub_download(
+            model,
+            entry["file"],
+            revision=revision,
+            local_dir=stripe_dir(volume, repo_folder, revision),
+        )
+        verify_model_file(stored, entry)
+        link = snapshot_dir / entry["file"]
+        replace_symlink(link, stored)
+        index.record(
+            model, revision, entry["file"], volume, entry["size"], stored, link
+        )
+        # Saved per file, a resumed install skips this file and would not record it again
+        index.save()
+        debug(f"Stored {model}/{entry['file']} on {volume}")
+
+    def fetch(entry):
+        run_step(
+            journal,
+            file_step(entry),
+            lambda: fetch_and_verify(entry),
+            cancel=cancel,
+            size=entry["size"],
+        )
+        advance(entry)
+
+    # Enough workers to keep every volume busy at once
+    with ThreadPoolExecutor(max_workers=len(volumes) * 2) as executor:
+        map_cancellable(executor, fetch, files)
+
+    write_refs_main(primary, repo_folder, revision)
+    index.save()
+    return snapshot_dir
+
+
+def set_torch_cache_dir(cache_dir):
+    """
+    Store torch hub downloads (torchvision weights) under <cache_dir>/hub.
+    This is process wide, call it once before loading models from several threads.
+    """
+    torch.hub.set_dir(str(Path(cache_dir).resolve() / "hub"))
+
+
+def get_torchvision_model(name, pretrained=True):
+    """
+    Load a torchvision model with optional pretrained weights.
+    Weights are downloaded to the torch hub directory, see set_torch_cache_dir.
 
     Args:
         name (str): Model name from torchvision.models
         pretrained (bool): Whether to load pretrained weights
-        cache_dir (str | Path): Optional custom directory to use for model weight caching
 
     Returns:
         model (torch.nn.Module): The loaded model
         preprocess (Callable | None): The transform associated with the weights
     """
-    if cache_dir:
-        os.environ["TORCH_HOME"] = str(Path(cache_dir).resolve())
-
     try:
-        model_fn = getattr(torchvision_models, name)
-    except AttributeError:
+        weights_enum = torchvision_models.get_model_weights(name)
+    except ValueError:
         raise ValueError(f"Model '{name}' not found in torchvision.models")
 
-    # Handle new Weights API (PEP-style enums)
-    if hasattr(model_fn, "__annotations__") and "weights" in model_fn.__annotations__:
-        weights_enum = model_fn.__annotations__["weights"]
-        weights = weights_enum.DEFAULT if pretrained else None
-        model = model_fn(weights=weights)
-        preprocess = weights.transforms() if weights else None
-    else:
-        # Legacy API
-        model = model_fn(pretrained=pretrained)
-        preprocess = None
-
+    weights = weights_enum.DEFAULT if pretrained else None
+    model = torchvision_models.get_model(name, weights=weights)
+    preprocess = weights.transforms() if weights else None
     return model, preprocess
 
 
@@ -4,6 +4,14 @@ from pim.config.config import DEFAULT_CONDA_ENV_NAME, SUPPORTED_FRAMEWORKS
 from pim.cli_utils.printing import warning
 from pim.utils.conda import check_dependency_conflicts
 
+# Keys of a parsed Pimfile that are not framework -> models lists
+PIMFILE_METADATA_KEYS = {
+    "env-name",
+    "conda-dependencies",
+    "pip-dependencies",
+    "model-options",
+}
+
 
 def initialize_parsed_dict():
     """
@@ -66,6 +74,8 @@ def parse_pimfile(pimfile_path):
             parsed["env-name"] = env_name
             conda_depencies = []
             pip_dependencies = []
+            # Per model settings other than name and dependencies, e.g. convert: safetensors
+            model_options = {}
 
             for framework, model_data in data.items():
                 if framework not in SUPPORTED_FRAMEWORKS:
@@ -80,6 +90,16 @@ def parse_pimfile(pimfile_path):
                         # Save model name to parsed dict to install at once
                         parsed[framework].append(model["name"])
 
+                        options = {
+                            key: value
+                            for key, value in model.items()
+                            if key not in ("name", "dependencies")
+                        }
+                        if options:
+                            model_options.setdefault(framework, {})[
+                                model["name"]
+                            ] = options
+
                         # TODO Handle case where no deps (Not required in pimfile)
                         if "dependencies" in model:
                             # Gather dependencies into conda and pip lists
@@ -94,6 +114,7 @@ def parse_pimfile(pimfile_path):
 
             parsed["conda-dependencies"] = conda_depencies
             parsed["pip-dependencies"] = pip_dependencies
+            parsed["model-options"] = model_options
             # Warning for potential conflicts
             check_dependency_conflicts(
                 parsed["conda-dependencies"], parsed["pip-dependencies"]
@@ -126,3 +147,61 @@ def parse_models_list(models_list):
         parsed[framework].append(model_name.strip())
 
     return parsed
+
+
+def diff_parsed_dicts(old, new):
+    """
+    Compare two parsed Pimfiles and return only what changed.
+    Ordering, duplicates and formatting (comments, whitespace) never show up in the diff.
+
+    Returns a dict with:
+        env_changed (bool): the env-name differs
+        added / removed (dict): framework -> models added or removed
+        options_changed (dict): framework -> models whose per model options differ
+        conda_added / pip_added / conda_removed / pip_removed (list): dependency changes
+    """
+    old = old or initialize_parsed_dict()
+    diff = {
+        "env_changed": old.get("env-name") != new.get("env-name"),
+        "added": {},
+        "removed": {},
+        "options_changed": {},
+    }
+
+    for framework in SUPPORTED_FRAMEWORKS:
+        old_models = set(old.get(framework, []))
+        new_models = set(new.get(framework, []))
+        if new_models - old_models:
+            diff["added"][framework] = sorted(new_models - old_models)
+        if old_models - new_models:
+            diff["removed"][framework] = sorted(old_models - new_models)
+
+        old_options = old.get("model-options", {}).get(framework, {})
+        new_options = new.get("model-options", {}).get(framework, {})
+        changed = sorted(
+            model
+            for model in new_models & old_models
+            if old_options.get(model) != new_options.get(model)
+        )
+        if changed:
+            diff["options_changed"][framework] = changed
+
+    for kind in ("conda", "pip"):
+        old_deps = set(old.get(f"{kind}-dependencies", []))
+        new_deps = set(new.get(f"{kind}-dependencies", []))
+        diff[f"{kind}_added"] = sorted(new_deps - old_deps)
+        diff[f"{kind}_removed"] = sorted(old_deps - new_deps)
+    return diff
+
+
+def is_empty_diff(diff):
+    return not (
+        diff["env_changed"]
+        or diff["added"]
+        or diff["removed"]
+        or diff["options_changed"]
+        or diff["conda_added"]
+        or diff["pip_added"]
+        or diff["conda_removed"]
+        or diff["pip_removed"]
+    )
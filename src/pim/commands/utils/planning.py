@@ -0,0 +1,162 @@
+import json
+import os
+
+from huggingface_hub import try_to_load_from_cache
+
+from pim.cli_utils.printing import info, warning
+from pim.commands.utils.sharding import resolve_model_files
+from pim.config.config import (
+    DISK_SPACE_MARGIN_BYTES,
+    STRIPE_MIN_BYTES,
+    THROUGHPUT_FILE,
+)
+from pim.utils.pathing import write_json_atomic
+from pim.utils.volumes import VolumeIndex, free_bytes
+
+
+def format_bytes(num_bytes):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(num_bytes) < 1000:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1000
+    return f"{num_bytes:.1f} TB"
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+
+def is_cached(entry, cache_dir):
+    cached = try_to_load_from_cache(
+        entry["model"], entry["file"], cache_dir=cache_dir, revision=entry["revision"]
+    )
+    # try_to_load_from_cache returns a sentinel for known missing files, only a str is a hit
+    return isinstance(cached, str)
+
+
+def get_measured_throughput():
+    """
+    Return the measured download throughput in bytes per second, or None if never measured.
+    """
+    if not THROUGHPUT_FILE.exists():
+        return None
+    with open(THROUGHPUT_FILE, "r") as f:
+        return json.load(f).get("bytes_per_second")
+
+
+def record_throughput(num_bytes, seconds, smoothing=0.3):
+    """
+    Fold a measured transfer into the stored throughput (exponential moving average).
+    """
+    if num_bytes <= 0 or seconds <= 0:
+        return
+    measured = num_bytes / seconds
+    previous = get_measured_throughput()
+    if previous:
+        measured = smoothing * measured + (1 - smoothing) * previous
+    write_json_atomic(THROUGHPUT_FILE, {"bytes_per_second": measured}, indent=None)
+
+
+def distinct_free_bytes(volumes):
+    """
+    Return the free space across volumes, counting each filesystem once
+    (several volumes may be directories on the same disk).
+    """
+    free = {}
+    for volume in volumes:
+        free.setdefault(os.stat(volume).st_dev, free_bytes(volume))
+    return sum(free.values())
+
+
+def build_install_plan(model_data, cache_dir):
+    """
+    Resolve every model's files and work out how much has to be fetched before installing.
+
+    Returns a dict with per model byte counts, the totals (total, cached and to fetch),
+    the free space on the cache volumes and an estimated transfer time.
+    Files below STRIPE_MIN_BYTES are never striped, the bytes of those that must land on
+    the primary volume are counted separately against its own free space.
+    """
+    files = resolve_model_files(model_data)
+    volumes = VolumeIndex(cache_dir).volumes
+    primary_fetch_bytes = 0
+    models = {}
+    for entry in files:
+        model = models.setdefault(
+            entry["model"],
+            {"files": 0, "total_bytes": 0, "cached_bytes": 0, "fetch_bytes": 0},
+        )
+        model["files"] += 1
+        model["total_bytes"] += entry["size"]
+        if is_cached(entry, cache_dir):
+            model["cached_bytes"] += entry["size"]
+        else:
+            model["fetch_bytes"] += entry["size"]
+            if len(volumes) == 1 or entry["size"] < STRIPE_MIN_BYTES:
+                primary_fetch_bytes += entry["size"]
+
+    plan = {
+        "models": models,
+        "total_bytes": sum(m["total_bytes"] for m in models.values()),
+        "cached_bytes": sum(m["cached_bytes"] for m in models.values()),
+        "fetch_bytes": sum(m["fetch_bytes"] for m in models.values()),
+        "free_bytes": distinct_free_bytes(volumes),
+        "primary_fetch_bytes": primary_fetch_bytes,
+        "primary_free_bytes": free_bytes(volumes[0]),
+        "bytes_per_second": get_measured_throughput(),
+    }
+    plan["estimated_seconds"] = (
+        plan["fetch_bytes"] / plan["bytes_per_second"]
+        if plan["bytes_per_second"]
+        else None
+    )
+    return plan
+
+
+def check_disk_space(plan):
+    """
+    Raise before any download starts if the files to fetch do not fit in the cache.
+    """
+    required = plan["fetch_bytes"] + DISK_SPACE_MARGIN_BYTES
+    if plan["fetch_bytes"] and required > plan["free_bytes"]:
+        raise OSError(
+            f"Not enough disk space: {format_bytes(plan['fetch_bytes'])} to download "
+            f"(plus {format_bytes(DISK_SPACE_MARGIN_BYTES)} margin) but only "
+            f"{format_bytes(plan['free_bytes'])} free in the cache"
+        )
+    primary_required = plan["primary_fetch_bytes"] + DISK_SPACE_MARGIN_BYTES
+    if plan["primary_fetch_bytes"] and primary_required > plan["primary_free_bytes"]:
+        raise OSError(
+            f"Not enough disk space on the primary cache volume: "
+            f"{format_bytes(plan['primary_fetch_bytes'])} of files below "
+            f"{format_bytes(STRIPE_MIN_BYTES)} are always stored there (plus "
+            f"{format_bytes(DISK_SPACE_MARGIN_BYTES)} margin) but only "
+            f"{format_bytes(plan['primary_free_bytes'])} is free"
+        )
+
+
+def print_plan(plan):
+    info("Install plan:", style="bold blue")
+    for model, entry in plan["models"].items():
+        info(
+            f"  {model}: {entry['files']} files, {format_bytes(entry['total_bytes'])} "
+            f"total, {format_bytes(entry['fetch_bytes'])} to fetch"
+        )
+    info(
+        f"Total {format_bytes(plan['total_bytes'])}, already cached "
+        f"{format_bytes(plan['cached_bytes'])}, to fetch {format_bytes(plan['fetch_bytes'])}"
+    )
+    info(f"Free space in cache: {format_bytes(plan['free_bytes'])}")
+    if plan["estimated_seconds"] is not None:
+        info(
+            f"Estimated transfer time: {format_duration(plan['estimated_seconds'])} "
+            f"at {format_bytes(plan['bytes_per_second'])}/s"
+        )
+    elif plan["fetch_bytes"]:
+        warning("No throughput measured yet, transfer time cannot be estimated")
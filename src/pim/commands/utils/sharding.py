@@ -0,0 +1,233 @@
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from huggingface_hub import HfApi, hf_hub_download
+from huggingface_hub.file_download import repo_folder_name
+
+from pim.cli_utils.printing import debug, info, success, warning
+from pim.config.config import METADATA_WORKERS, SUPPORTED_FRAMEWORKS
+from pim.utils.pathing import write_json_atomic
+from pim.utils.readiness import mark_ready
+
+MANIFEST_DIR_NAME = "manifests"
+MERGED_MANIFEST_NAME = "manifest.json"
+
+
+def parse_shard_spec(spec):
+    """
+    Parse a shard spec of the form 'i/N' into (i, N), with shards numbered from 0.
+    """
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected the form i/N (e.g. 0/4)")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{spec}', i must be between 0 and N-1")
+    return index, count
+
+
+def resolve_model_files(model_data, max_workers=METADATA_WORKERS):
+    """
+    Resolve every remote file of the models in model_data, pinned to a revision.
+    Metadata for all models is fetched concurrently, one request per model.
+    Returns a list of dicts with framework, model, file, size, revision and,
+    for LFS files, sha256.
+    Only Hugging Face models have remote file listings, other frameworks are skipped.
+    """
+    api = HfApi()
+    models = list(model_data.get("huggingface", []))
+
+    def fetch_info(model):
+        return api.model_info(model, files_metadata=True)
+
+    files = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # map keeps the Pimfile order, so the resolved list stays deterministic
+        for model, model_info in zip(models, executor.map(fetch_info, models)):
+            for sibling in model_info.siblings:
+                files.append(
+                    {
+                        "framework": "huggingface",
+                        "model": model,
+                        "file": sibling.rfilename,
+                        "size": sibling.size or 0,
+                        "revision": model_info.sha,
+                        "sha256": sibling.lfs.sha256 if sibling.lfs else None,
+                    }
+                )
+    for framework in SUPPORTED_FRAMEWORKS - {"huggingface"}:
+        if model_data.get(framework):
+            warning(f"Cannot resolve files of {framework} models yet, skipping them")
+    return files
+
+
+def plan_hash(files):
+    """
+    Hash the resolved file list so partial manifests from different plans are never merged.
+    """
+    keys = sorted(
+        (f["framework"], f["model"], f["file"], f["revision"]) for f in files
+    )
+    return hashlib.sha256(json.dumps(keys).encode()).hexdigest()
+
+
+def assign_shards(files, num_shards):
+    """
+    Deterministically split files across num_shards, balanced by bytes rather than count.
+    Files are placed largest first onto the currently lightest shard (ties go to the lowest index).
+    Returns a list of num_shards file lists.
+    """
+    shards = [[] for _ in range(num_shards)]
+    loads = [0] * num_shards
+    ordered = sorted(files, key=lambda f: (-f["size"], f["model"], f["file"]))
+    for entry in ordered:
+        target = min(range(num_shards), key=lambda i: (loads[i], i))
+        shards[target].append(entry)
+        loads[target] += entry["size"]
+    return shards
+
+
+def install_shard(files, cache_dir=None):
+    """
+    Download the files assigned to this shard and return their manifest entries.
+    """
+    entries = []
+    for entry in files:
+        local_path = hf_hub_download(
+            entry["model"],
+            entry["file"],
+            revision=entry["revision"],
+            cache_dir=cache_dir,
+        )
+        debug(f"Fetched {entry['model']}/{entry['file']}")
+        entries.append({**entry, "path": str(local_path)})
+    return entries
+
+
+def install_models_shard(model_data, cache_dir, shard_spec):
+    """
+    Install this worker's share of the resolved model files and write its partial manifest.
+    Every worker resolves the same plan, so the N shards together cover every file exactly once.
+    """
+    shard_index, num_shards = parse_shard_spec(shard_spec)
+    files = resolve_model_files(model_data)
+    plan = plan_hash(files)
+    shard_files = assign_shards(files, num_shards)[shard_index]
+
+    shard_bytes = sum(entry["size"] for entry in shard_files)
+    info(
+        f"Shard {shard_index}/{num_shards}: {len(shard_files)} of {len(files)} files "
+        f"({shard_bytes / 1e9:.2f} GB)",
+        style="bold blue",
+    )
+    entries = install_shard(shard_files, cache_dir)
+    path = write_partial_manifest(cache_dir, shard_index, num_shards, plan, entries)
+    success(f"Shard {shard_index}/{num_shards} installed, partial manifest at {path}")
+    return path
+
+
+def write_refs_main(primary, repo_folder, revision):
+    # Downloading by commit hash does not write refs, but loaders resolve 'main' through them
+    refs_main = Path(primary) / repo_folder / "refs" / "main"
+    refs_main.parent.mkdir(parents=True, exist_ok=True)
+    refs_main.write_text(revision)
+
+
+def get_manifest_dir(cache_dir):
+    manifest_dir = Path(cache_dir) / MANIFEST_DIR_NAME
+    manifest_dir.mkdir(parents=True, exist_ok=True)
+    return manifest_dir
+
+
+def write_partial_manifest(cache_dir, shard_index, num_shards, plan, entries):
+    path = (
+        get_manifest_dir(cache_dir)
+        / f"manifest.shard-{shard_index}-of-{num_shards}.json"
+    )
+    write_json_atomic(
+        path,
+        {
+            "plan": plan,
+            "shard": shard_index,
+            "num_shards": num_shards,
+            "files": entries,
+        },
+    )
+    return path
+
+
+def merge_manifests(cache_dir):
+    """
+    Combine the partial manifests written by each shard into one manifest.json.
+    Every shard of the plan must be present, and no file may be recorded twice with different sizes.
+    Models whose files are all on disk are then published like a regular install: their
+    refs/main is written so offline loaders resolve them, and they get a ready marker.
+    Returns the path of the merged manifest.
+    """
+    manifest_dir = get_manifest_dir(cache_dir)
+    partials = []
+    for path in sorted(manifest_dir.glob("manifest.shard-*-of-*.json")):
+        with open(path, "r") as f:
+            partials.append(json.load(f))
+    if not partials:
+        raise FileNotFoundError(f"No partial manifests found in {manifest_dir}")
+
+    plans = {(partial["plan"], partial["num_shards"]) for partial in partials}
+    if len(plans) > 1:
+        raise ValueError(
+            f"Partial manifests in {manifest_dir} come from {len(plans)} different plans, "
+            "remove the stale ones and try again"
+        )
+
+    plan, num_shards = plans.pop()
+    found = {partial["shard"] for partial in partials}
+    missing = sorted(set(range(num_shards)) - found)
+    if missing:
+        raise ValueError(f"Missing partial manifests for shards: {missing}")
+
+    models = {}
+    for partial in partials:
+        for entry in partial["files"]:
+            model_key = f"{entry['framework']}:{entry['model']}"
+            model = models.setdefault(
+                model_key, {"revision": entry["revision"], "files": {}}
+            )
+            previous = model["files"].get(entry["file"])
+            if previous is not None and previous["size"] != entry["size"]:
+                raise ValueError(
+                    f"Conflicting entries for {model_key}/{entry['file']} across shards"
+                )
+            model["files"][entry["file"]] = {
+                "size": entry["size"],
+                "path": entry["path"],
+            }
+
+    merged_path = Path(cache_dir) / MERGED_MANIFEST_NAME
+    write_json_atomic(
+        merged_path,
+        {"plan": plan, "num_shards": num_shards, "models": models},
+    )
+    info(f"Merged {len(partials)} partial manifests covering {len(models)} models")
+    publish_merged_models(cache_dir, models)
+    return merged_path
+
+
+def publish_merged_models(cache_dir, models):
+    """
+    Make the models of a merged manifest visible as installed.
+    """
+    for model_key, model in models.items():
+        framework, name = model_key.split(":", 1)
+        missing = [
+            file for file, entry in model["files"].items() if not Path(entry["path"]).exists()
+        ]
+        if missing:
+            warning(f"{model_key} is missing {len(missing)} files, not marking it ready")
+            continue
+        repo_folder = repo_folder_name(repo_id=name, repo_type="model")
+        write_refs_main(cache_dir, repo_folder, model["revision"])
+        snapshot_dir = Path(cache_dir) / repo_folder / "snapshots" / model["revision"]
+        mark_ready(cache_dir, framework, name, snapshot_dir)
+        debug(f"Published {model_key} at {snapshot_dir}")
@@ -0,0 +1,44 @@
+from pim.commands.base import BaseCommand
+from pim.utils.pathing import validate_cache_path
+from pim.utils.readiness import wait_until_ready
+from pim.cli_utils.printing import info, success, handle_cli_error
+
+
+class WaitCommand(BaseCommand):
+    """
+    Block until models are installed and published as ready by a running
+    (or later) 'pim install', e.g. to start a service as soon as the small
+    models it needs are in place while larger downloads continue.
+    """
+
+    name = "wait"
+    description = "Wait until models are installed and ready to load"
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument(
+            "models",
+            nargs="+",
+            help="Models to wait for, as 'model' or 'framework:model'",
+        )
+        self.parser.add_argument(
+            "--cache-dir",
+            default=None,
+            help="Cache the models are installed in (default: ~/.pim/cache)",
+        )
+        self.parser.add_argument(
+            "--timeout",
+            type=float,
+            default=None,
+            help="Give up after this many seconds (default: wait forever)",
+        )
+
+    def run(self, args) -> int:
+        try:
+            cache_dir = validate_cache_path(args.cache_dir)
+            info(f"Waiting for {', '.join(args.models)}")
+            ready = wait_until_ready(args.models, cache_dir, timeout=args.timeout)
+            for spec, marker in ready.items():
+                success(f"{spec} is ready at {marker['path']}")
+            return 0
+        except Exception as e:
+            handle_cli_error(e)
@@ -0,0 +1,148 @@
+import hashlib
+import time
+from pim.config.config import DEFAULT_CONDA_ENV_NAME
+from pim.commands.base import BaseCommand
+from pim.commands.install import run_install
+from pim.commands.utils.parsing import (
+    diff_parsed_dicts,
+    initialize_parsed_dict,
+    is_empty_diff,
+    parse_pimfile,
+)
+from pim.utils.conda import install_dependencies_in_env
+from pim.utils.file_watch import create_watcher
+from pim.utils.pathing import find_pimfile, validate_cache_volumes, validate_file_path
+from pim.utils.volumes import register_cache_volumes
+from pim.cli_utils.printing import debug, info, success, warning, handle_cli_error
+
+
+class WatchCommand(BaseCommand):
+    """
+    Watch the Pimfile and apply only what changed on every save:
+    new models are installed, new dependencies are added to the env and
+    removed entries are reported. Edits that do not change the parsed
+    Pimfile (comments, reordering, whitespace) do nothing.
+    """
+
+    name = "watch"
+    description = "Install Pimfile changes incrementally as the file is edited"
+
+    def add_arguments(self) -> None:
+        self.parser.add_argument(
+            "-f",
+            "--file",
+            default=None,
+            help="Path to the Pimfile, if not specified will walk up the directory tree to find it.",
+        )
+        self.parser.add_argument(
+            "--cache-dir",
+            default=None,
+            help="Specify where to save the models (default: ~/.pim/cache)",
+        )
+        self.parser.add_argument(
+            "--auth",
+            action="store_true",
+            help="Use Hugging Face token for private models",
+        )
+        self.parser.add_argument(
+            "--skip-initial",
+            action="store_true",
+            help="Do not run a full install of the Pimfile before watching it",
+        )
+
+    def run(self, args) -> int:
+        try:
+            cache_dir = register_cache_volumes(validate_cache_volumes(args.cache_dir))
+            pimfile_path = (
+                find_pimfile() if args.file is None else validate_file_path(args.file)
+            )
+
+            content_hash = file_hash(pimfile_path)
+            current = parse_pimfile(pimfile_path)
+            if not args.skip_initial:
+                run_install(current, cache_dir, auth=args.auth)
+
+            watcher = create_watcher(pimfile_path)
+            info(f"Watching {pimfile_path} for changes", style="bold blue")
+            try:
+                while True:
+                    watcher.wait()
+                    started = time.monotonic()
+                    new_hash = file_hash(pimfile_path)
+                    if new_hash is None or new_hash == content_hash:
+                        continue
+
+                    try:
+                        updated = parse_pimfile(pimfile_path)
+                    except (ValueError, FileNotFoundError) as e:
+                        # Keep watching, the file is probably mid-edit
+                        warning(f"Ignoring invalid Pimfile: {e}")
+                        content_hash = new_hash
+                        continue
+
+                    diff = diff_parsed_dicts(current, updated)
+                    if is_empty_diff(diff):
+                        debug("Pimfile edit does not change models or dependencies")
+                    else:
+                        try:
+                            apply_pimfile_diff(diff, updated, cache_dir, args.auth)
+                        except Exception as e:
+                            # Keep the last applied state, the next save retries the same delta
+                            warning(f"Failed to apply Pimfile changes, will retry on next save: {e}")
+                            continue
+                    content_hash = new_hash
+                    current = updated
+                    elapsed = time.monotonic() - started
+                    debug(f"Handled Pimfile change in {elapsed:.3f}s")
+            finally:
+                watcher.close()
+        except KeyboardInterrupt:
+            info("Stopped watching")
+            return 0
+        except Exception as e:
+            handle_cli_error(e)
+
+
+def file_hash(path):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def apply_pimfile_diff(diff, model_data, cache_dir, auth=False):
+    """
+    Act on a Pimfile diff without redoing the parts that did not change.
+    """
+    # Imported here so the watch loop does not load torch until a model must be installed
+    from pim.commands.utils.installers import install_models
+
+    if diff["env_changed"]:
+        info("Environment name changed, running a full install", style="bold yellow")
+        run_install(model_data, cache_dir, auth=auth)
+        return
+
+    env_name = model_data.get("env-name", DEFAULT_CONDA_ENV_NAME)
+    if diff["conda_added"] or diff["pip_added"]:
+        install_dependencies_in_env(
+            env_name, diff["conda_added"], diff["pip_added"], cache_dir
+        )
+    if diff["conda_removed"] or diff["pip_removed"]:
+        info(
+            "Dependencies no longer declared are left installed: "
+            f"{', '.join(diff['conda_removed'] + diff['pip_removed'])}"
+        )
+
+    # Models that are new, or whose options (e.g. convert) changed
+    to_install = initialize_parsed_dict()
+    for changes in (diff["added"], diff["options_changed"]):
+        for framework, models in changes.items():
+            to_install[framework].extend(models)
+    if any(to_install.values()):
+        to_install["model-options"] = model_data.get("model-options", {})
+        install_models(to_install, cache_dir, auth)
+
+    for framework, models in diff["removed"].items():
+        info(f"No longer declared ({framework}), kept in cache: {', '.join(models)}")
+    success("Pimfile changes applied")
@@ -1,8 +1,78 @@
 from pathlib import Path
 import os
 
-# Default: ~/.cache/pim
-DEFAULT_CACHE_DIR = Path(os.getenv("PIM_CACHE_DIR", "~/.cache/pim")).expanduser()
+# Default: ~/.cache/pim, several volumes can be given separated by os.pathsep.
+# An empty PIM_CACHE_DIR (e.g. 'PIM_CACHE_DIR=') also means the default
+DEFAULT_CACHE_VOLUMES = [
+    Path(path).expanduser()
+    for path in os.getenv("PIM_CACHE_DIR", "").split(os.pathsep)
+    if path
+] or [Path("~/.cache/pim").expanduser()]
+# The first volume holds the model index, logs and every other pim cache
+DEFAULT_CACHE_DIR = DEFAULT_CACHE_VOLUMES[0]
+
+# With several cache volumes, files at least this large are spread across them
+STRIPE_MIN_BYTES = 64 * 1024 * 1024
+
+# Shared package cache (wheels and conda packages) reused by every pim environment.
+# Lives in the model cache, so nodes sharing a --cache-dir share the packages too
+PACKAGE_CACHE_DIR_NAME = "packages"
+
+# Packed environment snapshots, keyed by the hash of their dependency set.
+# Also kept in the model cache
+ENV_SNAPSHOT_DIR_NAME = "env-snapshots"
+
+# Artifacts derived from installed models (e.g. safetensors conversions), keyed by source hash.
+# Lives inside the model cache it derives from, so links stay valid on shared caches
+DERIVED_DIR_NAME = "derived"
+
+# Processes converting checkpoints, each one holds a full checkpoint in memory
+CONVERSION_WORKERS = min(4, os.cpu_count() or 1)
+
+# Concurrent metadata requests when resolving model file lists
+METADATA_WORKERS = 16
+
+# Free space kept in reserve when checking that an install fits on disk
+DISK_SPACE_MARGIN_BYTES = 1024 * 1024 * 1024
+
+# Measured download throughput, used to estimate install times
+THROUGHPUT_FILE = DEFAULT_CACHE_DIR / "throughput.json"
+
+# Models unused for this many days are recompressed by 'pim cache compress'
+COLD_STORAGE_IDLE_DAYS = float(os.getenv("PIM_COLD_AFTER_DAYS", "30"))
+
+# zstd settings for cold storage, frames bound how much is decompressed to seek
+COLD_STORAGE_LEVEL = 3
+COLD_STORAGE_FRAME_BYTES = 16 * 1024 * 1024
+COLD_STORAGE_WORKERS = os.cpu_count() or 1
+
+# pim.log rotation, logs are appended across runs and rotated past this size
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+# Minimum seconds between two progress redraws in the console
+PROGRESS_REFRESH_INTERVAL = 0.1
+
+# Unix socket the optional pim daemon listens on
+DAEMON_SOCKET_PATH = Path(
+    os.getenv("PIM_DAEMON_SOCKET", str(DEFAULT_CACHE_DIR / "pimd.sock"))
+).expanduser()
+
+# Worker threads the daemon runs install jobs on
+DAEMON_WORKERS = 4
+
+# Worker threads used by the pim.api async functions
+API_WORKERS = 4
+
+# Models installed concurrently by install_models, in priority order
+INSTALL_WORKERS = 4
+
+# Retries of a failed install step (download, dependency install), with exponential backoff
+INSTALL_RETRIES = 3
+RETRY_BACKOFF_SECONDS = 2.0
+
+# How often 'pim wait' checks for ready markers, in seconds
+READY_POLL_INTERVAL = 0.1
 
 # Base conda env name (for shared use)
 DEFAULT_CONDA_ENV_NAME = "pim-ai"  # TODO I can make this env var configurable
@@ -16,5 +86,8 @@ ISOLATED_ENV_PREFIX = "pim-isolated"
 # Supported frameworks for installation #TODO Not sure if this should be a config setting or hidden in code
 SUPPORTED_FRAMEWORKS = {"huggingface", "torch", "sklearn", "custom"}
 
+# Frameworks pim actually installs, only their models are ever published as ready
+INSTALLABLE_FRAMEWORKS = {"huggingface", "torch"}
+
 # # Location of registry or Pimfile fallback
 # DEFAULT_PIMFILE = Path.cwd() / "Pimfile"
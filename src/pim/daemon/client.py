@@ -0,0 +1,53 @@
+import json
+import os
+import socket
+
+from pim.config.config import DAEMON_SOCKET_PATH
+
+
+class DaemonError(RuntimeError):
+    """Raised when the daemon reports a failure for a request."""
+
+    def __init__(self, message, error_type=None):
+        super().__init__(message)
+        self.error_type = error_type
+
+
+def connect(socket_path=DAEMON_SOCKET_PATH, timeout=None):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    sock.connect(str(socket_path))
+    return sock
+
+
+def daemon_available(socket_path=DAEMON_SOCKET_PATH):
+    """
+    Return True when a pim daemon is listening on socket_path.
+    Setting PIM_NO_DAEMON forces commands to run in process.
+    """
+    if os.getenv("PIM_NO_DAEMON") or not os.path.exists(socket_path):
+        return False
+    try:
+        with connect(socket_path, timeout=1):
+            return True
+    except OSError:
+        return False
+
+
+def call_daemon(method, socket_path=DAEMON_SOCKET_PATH, **params):
+    """
+    Send one request to the daemon and return its result.
+    Requests are newline delimited JSON: {"method": ..., "params": {...}}.
+    """
+    with connect(socket_path) as sock:
+        request = json.dumps({"method": method, "params": params}) + "\n"
+        sock.sendall(request.encode())
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+
+    if not line:
+        raise DaemonError(f"Daemon closed the connection during '{method}'")
+    response = json.loads(line)
+    if not response["ok"]:
+        raise DaemonError(response["error"], response.get("type"))
+    return response["result"]
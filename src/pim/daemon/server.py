@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pim.cli_utils.printing import debug, info, success
+from pim.commands.install import collect_model_data, run_install
+from pim.commands.utils.parsing import parse_pimfile
+from pim.config.config import (
+    DAEMON_SOCKET_PATH,
+    DAEMON_WORKERS,
+    SUPPORTED_FRAMEWORKS,
+)
+from pim.daemon.client import daemon_available
+from pim.utils.conda import get_conda_base
+
+
+class PimDaemon:
+    """
+    Long lived pim state shared by every client request.
+
+    - Heavy libraries (torch, huggingface_hub) are imported once at startup.
+    - Parsed Pimfiles are cached until the file changes on disk, and the conda
+      base prefix is resolved once.
+    - Installs run on a fixed pool of worker threads, so huggingface_hub's
+      per-thread HTTP sessions keep their connections alive across jobs.
+    - Identical in-flight jobs are deduplicated: concurrent callers share one result.
+      Different jobs that share an env set it up one at a time.
+    """
+
+    def __init__(self, workers=DAEMON_WORKERS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="pimd-job"
+        )
+        self._jobs = {}
+        self._jobs_lock = threading.Lock()
+        self._pimfiles = {}
+        self._pimfiles_lock = threading.Lock()
+        self.methods = {
+            "ping": self.ping,
+            "list": self.list_models,
+            "install": self.install,
+        }
+
+    def warm_up(self):
+        # Importing the installers pulls in torch and huggingface_hub
+        import pim.commands.utils.installers  # noqa: F401
+
+        get_conda_base()
+
+    def ping(self):
+        with self._jobs_lock:
+            jobs = len(self._jobs)
+        return {"pid": os.getpid(), "jobs": jobs}
+
+    def parse_pimfile_cached(self, pimfile_path):
+        """
+        Parse a Pimfile, reusing the previous result while its mtime and size are unchanged.
+        """
+        stat = os.stat(pimfile_path)
+        key = str(pimfile_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._pimfiles_lock:
+            cached = self._pimfiles.get(key)
+            if cached is not None and cached[0] == stamp:
+                debug(f"Using cached parse of {key}")
+                return json.loads(cached[1])
+        parsed = parse_pimfile(pimfile_path)
+        with self._pimfiles_lock:
+            # Stored serialized so callers can never mutate the cached copy
+            self._pimfiles[key] = (stamp, json.dumps(parsed))
+        return parsed
+
+    def list_models(self, pimfile):
+        return self.parse_pimfile_cached(Path(pimfile))
+
+    def submit_job(self, key, fn, *args, **kwargs):
+        """
+        Run fn on the job pool unless an identical job (same key) is already in flight,
+        in which case the caller waits on the existing job instead.
+        """
+        with self._jobs_lock:
+            future = self._jobs.get(key)
+            if future is not None:
+                debug(f"Joining in-flight job {key[:12]}")
+                return future
+            future = self._executor.submit(fn, *args, **kwargs)
+            self._jobs[key] = future
+
+        def _forget(_):
+            with self._jobs_lock:
+                self._jobs.pop(key, None)
+
+        future.add_done_callback(_forget)
+        return future
+
+    def install(
+        self,
+        models,
+        pimfile,
+        cache_dir,
+        auth=False,
+        isolated=False,
+        shard=None,
+        resume=False,
+    ):
+        params = [models, pimfile, cache_dir, auth, isolated, shard, resume]
+        key = hashlib.sha256(json.dumps(["install"] + params).encode()).hexdigest()
+        return self.submit_job(key, self._run_install, *params).result()
+
+    def _run_install(self, models, pimfile, cache_dir, auth, isolated, shard, resume):
+        pimfile_path = Path(pimfile) if pimfile else None
+        model_data = collect_model_data(
+            models, pimfile_path, parse=self.parse_pimfile_cached
+        )
+        run_install(
+            model_data,
+            Path(cache_dir),
+            auth=auth,
+            isolated=isolated,
+            shard=shard,
+            resume=resume,
+        )
+        installed = sum(
+            len(model_data.get(framework, [])) for framework in SUPPORTED_FRAMEWORKS
+        )
+        return {"models": installed}
+
+    def dispatch(self, request):
+        method = self.methods.get(request.get("method"))
+        if method is None:
+            return {
+                "ok": False,
+                "error": f"Unknown method: {request.get('method')}",
+                "type": "ValueError",
+            }
+        try:
+            return {"ok": True, "result": method(**request.get("params", {}))}
+        except Exception as e:
+            return {"ok": False, "error": str(e), "type": type(e).__name__}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {
+                    "ok": False,
+                    "error": "Malformed request",
+                    "type": "ValueError",
+                }
+            else:
+                response = self.server.pim_daemon.dispatch(request)
+            self.wfile.write((json.dumps(response) + "\n").encode())
+
+
+class _DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, pim_daemon):
+        self.pim_daemon = pim_daemon
+        super().__init__(str(socket_path), _RequestHandler)
+
+
+def serve(socket_path=DAEMON_SOCKET_PATH, workers=DAEMON_WORKERS):
+    """
+    Run the pim daemon in the foreground until interrupted.
+    """
+    socket_path = Path(socket_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if daemon_available(socket_path):
+        raise RuntimeError(f"A pim daemon is already listening on {socket_path}")
+    if socket_path.exists():
+        # A leftover socket from a daemon that did not shut down cleanly
+        socket_path.unlink()
+
+    daemon = PimDaemon(workers=workers)
+    info("Warming up pim daemon", style="bold blue")
+    daemon.warm_up()
+
+    server = _DaemonServer(socket_path, daemon)
+    os.chmod(socket_path, 0o600)
+    success(f"pim daemon listening on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        info("Stopping pim daemon")
+    finally:
+        server.server_close()
+        daemon.shutdown()
+        if socket_path.exists():
+            socket_path.unlink()
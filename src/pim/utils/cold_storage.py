@@ -0,0 +1,303 @@
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pim.cli_utils.printing import debug, info, success, warning
+from pim.config.config import (
+    COLD_STORAGE_FRAME_BYTES,
+    COLD_STORAGE_LEVEL,
+    COLD_STORAGE_WORKERS,
+)
+from pim.utils.pathing import write_json_atomic
+from pim.utils.readiness import clear_ready
+
+USAGE_FILE_NAME = "usage.json"
+COLD_DIR_NAME = "cold"
+COMPRESSED_SUFFIX = ".zst"
+HF_MODEL_PREFIX = "models--"
+
+# Files that shrink by less than this are kept uncompressed, they would cost restore time for nothing
+MIN_COMPRESSION_RATIO = 1.05
+
+_usage_lock = threading.Lock()
+
+
+def _require_pyzstd():
+    try:
+        import pyzstd
+    except ImportError:
+        raise RuntimeError(
+            "Cold storage needs the pyzstd package, install it with 'pip install pyzstd'"
+        )
+    return pyzstd
+
+
+def model_key(framework, model):
+    return f"{framework}:{model}"
+
+
+def cold_manifest_path(cache_dir, framework, model):
+    return (
+        Path(cache_dir) / COLD_DIR_NAME / f"{framework}__{model.replace('/', '--')}.json"
+    )
+
+
+def is_compressed(cache_dir, framework, model):
+    return cold_manifest_path(cache_dir, framework, model).exists()
+
+
+def load_usage(cache_dir):
+    path = Path(cache_dir) / USAGE_FILE_NAME
+    if not path.exists():
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def record_model_use(cache_dir, framework, model):
+    """
+    Remember when a model was last requested, idle models are candidates for compression.
+    """
+    with _usage_lock:
+        usage = load_usage(cache_dir)
+        usage[model_key(framework, model)] = time.time()
+        write_json_atomic(Path(cache_dir) / USAGE_FILE_NAME, usage)
+
+
+def list_cached_models(cache_dir):
+    """
+    Return {model: repo folder} for the Hugging Face models in the cache.
+    """
+    models = {}
+    for repo_dir in Path(cache_dir).glob(f"{HF_MODEL_PREFIX}*"):
+        if repo_dir.is_dir():
+            model = repo_dir.name[len(HF_MODEL_PREFIX) :].replace("--", "/")
+            models[model] = repo_dir
+    return models
+
+
+def model_files(repo_dir):
+    """
+    Return the real files behind a model's snapshots: its blobs, plus striped files
+    stored on other volumes. Each file is listed once even if several revisions link it.
+    """
+    files = set()
+    for path in (repo_dir / "snapshots").rglob("*"):
+        real_path = path.resolve()
+        if real_path.is_file():
+            files.add(real_path)
+    return sorted(files)
+
+
+def last_used(cache_dir, framework, model, repo_dir, usage):
+    recorded = usage.get(model_key(framework, model))
+    if recorded is not None:
+        return recorded
+    # Never recorded: installed before usage tracking, fall back to the snapshot time
+    return (repo_dir / "snapshots").stat().st_mtime
+
+
+def find_idle_models(cache_dir, idle_days):
+    """
+    Return {model: repo folder} for uncompressed models unused for more than idle_days.
+    """
+    usage = load_usage(cache_dir)
+    cutoff = time.time() - idle_days * 86400
+    idle = {}
+    for model, repo_dir in list_cached_models(cache_dir).items():
+        if is_compressed(cache_dir, "huggingface", model):
+            continue
+        if last_used(cache_dir, "huggingface", model, repo_dir, usage) < cutoff:
+            idle[model] = repo_dir
+    return idle
+
+
+def compress_file(path, workers=COLD_STORAGE_WORKERS):
+    """
+    Compress path into a seekable zstd file next to it and remove the original.
+    Returns the compressed size, or None if the file is kept as is because it barely shrinks.
+    """
+    pyzstd = _require_pyzstd()
+    path = Path(path)
+    compressed = Path(f"{path}{COMPRESSED_SUFFIX}")
+    partial_path = Path(f"{compressed}.partial")
+    option = {
+        pyzstd.CParameter.compressionLevel: COLD_STORAGE_LEVEL,
+        pyzstd.CParameter.nbWorkers: workers,
+    }
+    with open(path, "rb") as src, pyzstd.SeekableZstdFile(
+        partial_path,
+        "w",
+        level_or_option=option,
+        max_frame_content_size=COLD_STORAGE_FRAME_BYTES,
+    ) as dst:
+        for chunk in iter(lambda: src.read(COLD_STORAGE_FRAME_BYTES), b""):
+            dst.write(chunk)
+
+    size = path.stat().st_size
+    compressed_size = partial_path.stat().st_size
+    if compressed_size * MIN_COMPRESSION_RATIO > size:
+        partial_path.unlink()
+        return None
+    shutil.copymode(path, partial_path)
+    # The compressed copy is complete before the original goes away
+    os.replace(partial_path, compressed)
+    path.unlink()
+    return compressed_size
+
+
+def compress_model(cache_dir, model, repo_dir):
+    """
+    Recompress every file of a model into seekable zstd and record it in a cold manifest.
+    Returns (original bytes, stored bytes).
+    """
+    manifest_path = cold_manifest_path(cache_dir, "huggingface", model)
+    entries = [
+        {"path": str(path), "size": path.stat().st_size}
+        for path in model_files(repo_dir)
+    ]
+    # Written before any file changes, so an interrupted run can still be restored
+    manifest = {
+        "framework": "huggingface",
+        "model": model,
+        "compressed_at": time.time(),
+        "files": entries,
+    }
+    write_json_atomic(manifest_path, manifest)
+    # The model cannot be loaded until it is restored
+    clear_ready(cache_dir, "huggingface", model)
+
+    stored_total = 0
+    for entry in sorted(entries, key=lambda e: -e["size"]):
+        compressed_size = compress_file(entry["path"])
+        entry["compressed_size"] = compressed_size
+        stored_total += entry["size"] if compressed_size is None else compressed_size
+        debug(f"Compressed {entry['path']}: {entry['size']} -> {compressed_size}")
+    write_json_atomic(manifest_path, manifest)
+    return sum(entry["size"] for entry in entries), stored_total
+
+
+def compress_idle_models(cache_dir, idle_days, models=None):
+    """
+    Compress the given models, or every model idle for more than idle_days,
+    and report the compression ratio of each one. Returns {model: ratio}.
+    """
+    _require_pyzstd()
+    cached = list_cached_models(cache_dir)
+    if models:
+        missing = [model for model in models if model not in cached]
+        for model in missing:
+            warning(f"{model} is not in the cache, skipping")
+        targets = {
+            model: cached[model]
+            for model in models
+            if model in cached and not is_compressed(cache_dir, "huggingface", model)
+        }
+    else:
+        targets = find_idle_models(cache_dir, idle_days)
+
+    if not targets:
+        info("No models to compress")
+        return {}
+
+    ratios = {}
+    saved = 0
+    for model, repo_dir in targets.items():
+        started = time.monotonic()
+        original, stored = compress_model(cache_dir, model, repo_dir)
+        ratios[model] = original / stored if stored else 1.0
+        saved += original - stored
+        info(
+            f"{model}: {original / 1e6:.1f} MB -> {stored / 1e6:.1f} MB "
+            f"({ratios[model]:.2f}x) in {time.monotonic() - started:.1f}s"
+        )
+    success(f"Compressed {len(ratios)} models, recovered {saved / 1e9:.2f} GB")
+    return ratios
+
+
+def decompress_range(compressed, fd, start, length):
+    pyzstd = _require_pyzstd()
+    with pyzstd.SeekableZstdFile(compressed, "r") as src:
+        # Ranges start at multiples of the frame size, so each one starts on a frame boundary
+        src.seek(start)
+        os.pwrite(fd, src.read(length), start)
+
+
+def restore_file(executor, path, size):
+    """
+    Decompress one file, its frames split into ranges decompressed in parallel.
+    Returns the futures to wait on and a callback that finalizes the file once they are done.
+    """
+    path = Path(path)
+    compressed = Path(f"{path}{COMPRESSED_SUFFIX}")
+    if not compressed.exists():
+        # Never compressed (did not shrink enough) or already restored
+        return [], lambda: None
+    if path.exists():
+        # Interrupted compression, the original is still complete
+        return [], compressed.unlink
+
+    partial_path = Path(f"{path}.partial")
+    fd = os.open(partial_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    os.ftruncate(fd, size)
+    futures = [
+        executor.submit(
+            decompress_range,
+            compressed,
+            fd,
+            start,
+            min(COLD_STORAGE_FRAME_BYTES, size - start),
+        )
+        for start in range(0, size, COLD_STORAGE_FRAME_BYTES)
+    ]
+
+    def finalize():
+        os.close(fd)
+        shutil.copymode(compressed, partial_path)
+        os.replace(partial_path, path)
+        compressed.unlink()
+
+    return futures, finalize
+
+
+def restore_model(cache_dir, framework, model, workers=COLD_STORAGE_WORKERS):
+    """
+    Decompress a model stored in cold storage so loaders can read it again.
+    Every file, and every range within large files, is decompressed in parallel.
+    Returns False if the model was not compressed.
+    """
+    manifest_path = cold_manifest_path(cache_dir, framework, model)
+    if not manifest_path.exists():
+        return False
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = [
+            restore_file(executor, entry["path"], entry["size"])
+            for entry in manifest["files"]
+        ]
+        for futures, finalize in pending:
+            for future in futures:
+                future.result()
+            finalize()
+
+    manifest_path.unlink()
+    record_model_use(cache_dir, framework, model)
+    info(f"Restored {model} from cold storage in {time.monotonic() - started:.1f}s")
+    return True
+
+
+def restore_all_models(cache_dir):
+    restored = 0
+    for manifest_path in sorted((Path(cache_dir) / COLD_DIR_NAME).glob("*.json")):
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        restored += restore_model(cache_dir, manifest["framework"], manifest["model"])
+    success(f"Restored {restored} models from cold storage")
+    return restored
@@ -1,43 +1,129 @@
+import json
 import os
 import re
 import subprocess
-import sys
+import threading
+from collections import defaultdict
+from functools import lru_cache
 
 from pim.cli_utils.printing import debug, info, warning, success
 from pim.config.config import DEFAULT_PYTHON_VERSION
+from pim.utils.journal import run_step
+from pim.utils.package_cache import (
+    conda_cache_env,
+    install_conda_from_cache,
+    install_pip_from_cache,
+)
+from pim.utils.env_snapshots import (
+    dependency_set_hash,
+    restore_env_snapshot,
+    save_env_snapshot,
+    snapshot_exists,
+)
+
+# Installs running in one process (daemon jobs, API callers) may share an env,
+# conda must never touch one env twice at once
+_env_locks = defaultdict(threading.Lock)
+
+
+def handle_conda_env_and_dependencies(
+    env_name, conda_deps, pip_deps, journal=None, cache_dir=None
+):
+    """
+    Create the env (or restore it from a snapshot) and install its dependencies.
+    Snapshots and packages are shared through cache_dir (default: the pim cache).
+    With an install journal, steps completed by an interrupted run are skipped and
+    dependency installs are retried with backoff.
+    Concurrent calls for the same env in this process run one after the other.
+    """
+    with _env_locks[env_name]:
+        _setup_conda_env(env_name, conda_deps, pip_deps, journal, cache_dir)
 
 
-def handle_conda_env_and_dependencies(env_name, conda_deps, pip_deps):
+def _setup_conda_env(env_name, conda_deps, pip_deps, journal, cache_dir):
+    snapshot_hash = dependency_set_hash(conda_deps, pip_deps)
+    deps_step = f"deps-installed:{env_name}:{snapshot_hash}"
     # Check if base conda env doesnt already exist
     if conda_env_exists(env_name):
         debug(f"{env_name} conda environment already exists, skipping creation.")
     else:
+        # A snapshot of the same dependency set lets us skip solving and installing
+        if snapshot_exists(snapshot_hash, cache_dir) and restore_env_snapshot(
+            snapshot_hash, get_env_prefix(env_name), cache_dir
+        ):
+            success(f"Conda environment restored from snapshot: {env_name}")
+            if journal is not None:
+                journal.record(f"env-created:{env_name}", "done", snapshot=snapshot_hash)
+                journal.record(deps_step, "done")
+            return
+
         info(
             f"Creating new conda environment: {env_name} with Python {DEFAULT_PYTHON_VERSION}",
             style="bold blue",
         )
-        # Create the base conda environment
-        create_conda_env(env_name)
+        # Create the base conda environment, not retried since conda leaves a partial prefix
+        run_step(
+            journal,
+            f"env-created:{env_name}",
+            lambda: create_conda_env(env_name, cache_dir),
+            retries=0,
+        )
         success(f"Conda environment created: {env_name}")
 
-    install_dependencies_in_env(
-        env_name,
-        conda_deps,
-        pip_deps,
+        run_step(
+            journal,
+            deps_step,
+            lambda: install_dependencies_in_env(
+                env_name, conda_deps, pip_deps, cache_dir
+            ),
+        )
+        save_env_snapshot(get_env_prefix(env_name), snapshot_hash, cache_dir)
+        return
+
+    run_step(
+        journal,
+        deps_step,
+        lambda: install_dependencies_in_env(env_name, conda_deps, pip_deps, cache_dir),
     )
 
 
-def conda_env_exists(env_name):
+@lru_cache(maxsize=None)
+def get_conda_base():
+    """
+    Return the conda base prefix, queried once per process.
+    """
     conda_info = subprocess.run(
         ["conda", "info", "--base"], capture_output=True, text=True
     )
-    base_path = conda_info.stdout.strip().splitlines()[-1]
-    return os.path.exists(os.path.join(base_path, "envs", env_name))
+    return conda_info.stdout.strip().splitlines()[-1]
+
+
+def get_env_prefix(env_name):
+    return os.path.join(get_conda_base(), "envs", env_name)
 
 
-def install_dependencies_in_env(env_name, conda_deps, pip_deps):
+def conda_env_exists(env_name):
+    return os.path.exists(get_env_prefix(env_name))
+
+
+def list_conda_envs():
+    """
+    Return a dict mapping each named conda environment to its prefix.
+    """
+    result = subprocess.run(
+        ["conda", "env", "list", "--json"], capture_output=True, text=True, check=True
+    )
+    envs = {}
+    for prefix in json.loads(result.stdout).get("envs", []):
+        if os.path.dirname(prefix) == os.path.join(get_conda_base(), "envs"):
+            envs[os.path.basename(prefix)] = prefix
+    return envs
+
+
+def install_dependencies_in_env(env_name, conda_deps, pip_deps, cache_dir=None):
     """
     Install conda and pip dependencies in the specified conda environment.
+    Packages come from the shared package cache, so each one is only downloaded once across envs.
     """
     if conda_deps or pip_deps:
         info(
@@ -45,23 +131,13 @@ def install_dependencies_in_env(env_name, conda_deps, pip_deps):
             style="bold blue",
         )
     if conda_deps:
-        subprocess.run(
-            ["conda", "run", "-n", env_name, "conda", "install", "-y"] + conda_deps,
-            check=True,
-            stdout=sys.stdout,
-            stderr=sys.stderr,
-        )
+        install_conda_from_cache(env_name, conda_deps, cache_dir)
 
     if pip_deps:
-        subprocess.run(
-            ["conda", "run", "-n", env_name, "pip", "install"] + pip_deps,
-            check=True,
-            stdout=sys.stdout,
-            stderr=sys.stderr,
-        )
+        install_pip_from_cache(env_name, pip_deps, cache_dir)
 
 
-def create_conda_env(env_name):
+def create_conda_env(env_name, cache_dir=None):
     """
     Create a new conda environment with the specified name and Python version.
     """
@@ -76,6 +152,7 @@ def create_conda_env(env_name):
             "-q",
         ],
         check=True,
+        env=conda_cache_env(cache_dir),
     )
 
 
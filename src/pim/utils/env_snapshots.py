@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pim.cli_utils.printing import debug, info, warning
+from pim.config.config import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_PYTHON_VERSION,
+    ENV_SNAPSHOT_DIR_NAME,
+)
+
+
+def dependency_set_hash(conda_deps, pip_deps, python_version=DEFAULT_PYTHON_VERSION):
+    """
+    Hash everything that determines the contents of an environment.
+    Ordering and duplicates in the dependency lists do not change the hash.
+    """
+    dependency_set = {
+        "python": python_version,
+        "platform": f"{platform.system()}-{platform.machine()}",
+        "conda": sorted(set(conda_deps or [])),
+        "pip": sorted(set(pip_deps or [])),
+    }
+    encoded = json.dumps(dependency_set, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def get_snapshot_dir(cache_dir=None):
+    return Path(cache_dir or DEFAULT_CACHE_DIR) / ENV_SNAPSHOT_DIR_NAME
+
+
+def get_snapshot_path(snapshot_hash, cache_dir=None):
+    return get_snapshot_dir(cache_dir) / f"{snapshot_hash}.tar"
+
+
+def snapshot_exists(snapshot_hash, cache_dir=None):
+    return get_snapshot_path(snapshot_hash, cache_dir).exists()
+
+
+def save_env_snapshot(env_prefix, snapshot_hash, cache_dir=None):
+    """
+    Pack the environment at env_prefix into a relocatable archive keyed by snapshot_hash.
+    Best effort: skipped with a warning when conda-pack is not installed or refuses the env.
+    """
+    if shutil.which("conda-pack") is None:
+        warning("conda-pack is not installed, skipping environment snapshot")
+        return None
+
+    get_snapshot_dir(cache_dir).mkdir(parents=True, exist_ok=True)
+    snapshot_path = get_snapshot_path(snapshot_hash, cache_dir)
+    # Write next to the final path first so a half written snapshot is never restored
+    partial_path = snapshot_path.with_suffix(".tar.partial")
+    info(f"Saving environment snapshot {snapshot_hash[:12]}")
+    try:
+        subprocess.run(
+            [
+                "conda-pack",
+                "-p",
+                str(env_prefix),
+                "-o",
+                str(partial_path),
+                "--format",
+                "tar",
+                "--n-threads",
+                "-1",
+                "--force",
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except subprocess.CalledProcessError as e:
+        # e.g. pip overwrote conda managed files, the env itself is fine so only warn
+        partial_path.unlink(missing_ok=True)
+        warning(f"Could not snapshot environment, continuing without: {e.stderr.strip()}")
+        return None
+    os.replace(partial_path, snapshot_path)
+    debug(f"Environment snapshot written to {snapshot_path}")
+    return snapshot_path
+
+
+def _extract_members(archive_path, members, env_prefix):
+    # Each worker owns a file handle, uncompressed tar members can be read at any offset
+    with tarfile.open(archive_path, "r:") as archive:
+        for member in members:
+            archive.extract(member, env_prefix, set_attrs=True)
+
+
+def extract_archive(archive_path, env_prefix, workers=None):
+    """
+    Extract an uncompressed tar archive into env_prefix using a pool of workers.
+    Directories are created first, regular files are extracted in parallel,
+    and links are created last once their targets exist.
+    """
+    workers = workers or os.cpu_count() or 1
+    with tarfile.open(archive_path, "r:") as archive:
+        members = archive.getmembers()
+
+    files = [m for m in members if m.isfile()]
+    others = [m for m in members if not (m.isdir() or m.isfile())]
+
+    # Create every directory up front so workers never race on makedirs
+    for member in members:
+        target = Path(env_prefix) / member.name
+        (target if member.isdir() else target.parent).mkdir(parents=True, exist_ok=True)
+
+    # Round robin split keeps large and small files spread across workers
+    batches = [files[i::workers] for i in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_extract_members, archive_path, batch, env_prefix)
+            for batch in batches
+            if batch
+        ]
+        for future in futures:
+            future.result()
+
+    _extract_members(archive_path, others, env_prefix)
+
+
+def restore_env_snapshot(snapshot_hash, env_prefix, cache_dir=None):
+    """
+    Restore a packed environment into env_prefix and rewrite its prefixes,
+    skipping the conda solver entirely.
+    Best effort: if the snapshot cannot be restored (corrupt archive, packed by another
+    conda layout), it is moved aside with a warning and False is returned, so the caller
+    builds the env the regular way and later installs do not hit the same snapshot.
+    """
+    snapshot_path = get_snapshot_path(snapshot_hash, cache_dir)
+    env_prefix = Path(env_prefix)
+    info(f"Restoring environment from snapshot {snapshot_hash[:12]}")
+    env_prefix.mkdir(parents=True, exist_ok=False)
+    try:
+        extract_archive(snapshot_path, env_prefix)
+        if os.name == "nt":
+            unpack_cmd = [str(env_prefix / "Scripts" / "conda-unpack.exe")]
+        else:
+            unpack_cmd = [
+                str(env_prefix / "bin" / "python"),
+                str(env_prefix / "bin" / "conda-unpack"),
+            ]
+        subprocess.run(unpack_cmd, check=True, capture_output=True)
+    except Exception as e:
+        # Never leave a half restored environment behind, conda would treat it as existing
+        shutil.rmtree(env_prefix, ignore_errors=True)
+        broken_path = Path(f"{snapshot_path}.broken")
+        os.replace(snapshot_path, broken_path)
+        warning(
+            f"Could not restore environment snapshot {snapshot_hash[:12]} ({e}), "
+            f"moved it to {broken_path} and creating the environment instead"
+        )
+        return False
+    debug(f"Environment restored to {env_prefix}")
+    return True
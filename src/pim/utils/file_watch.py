@@ -0,0 +1,102 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+# inotify event masks, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Editors often write a file in several steps, wait this long for the burst to settle
+DEBOUNCE_SECONDS = 0.05
+
+
+class InotifyWatcher:
+    """
+    Watch a single file through inotify on its parent directory.
+    Watching the directory also catches editors that save by writing a temp file and renaming it.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path).resolve()
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+        if libc.inotify_add_watch(self.fd, str(self.path.parent).encode(), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"Cannot watch {self.path.parent}")
+
+    def _read_names(self):
+        data = os.read(self.fd, 64 * 1024)
+        names = set()
+        offset = 0
+        while offset < len(data):
+            _, _, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            names.add(data[offset : offset + name_len].rstrip(b"\0").decode())
+            offset += name_len
+        return names
+
+    def wait(self):
+        """Block until the watched file changes."""
+        while True:
+            select.select([self.fd], [], [])
+            changed = self.path.name in self._read_names()
+            # Drain the rest of the burst so one save triggers one change
+            while select.select([self.fd], [], [], DEBOUNCE_SECONDS)[0]:
+                changed = self.path.name in self._read_names() or changed
+            if changed:
+                return
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """
+    Fallback watcher for platforms without inotify, compares mtime and size periodically.
+    """
+
+    def __init__(self, path, interval=0.5):
+        self.path = Path(path)
+        self.interval = interval
+        self._stamp = self._stat()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def wait(self):
+        """Block until the watched file changes."""
+        while True:
+            time.sleep(self.interval)
+            stamp = self._stat()
+            if stamp != self._stamp:
+                self._stamp = stamp
+                return
+
+    def close(self):
+        pass
+
+
+def create_watcher(path):
+    """
+    Return an inotify based watcher for path when available, otherwise a polling one.
+    """
+    try:
+        return InotifyWatcher(path)
+    except (OSError, AttributeError):
+        # AttributeError: libc without inotify symbols (e.g. macOS)
+        return PollingWatcher(path)
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from pim.cli_utils.printing import debug, warning
+from pim.config.config import INSTALL_RETRIES, RETRY_BACKOFF_SECONDS
+from pim.utils.pathing import write_json_atomic
+
+JOURNAL_DIR_NAME = "journals"
+
+
+class InstallCancelled(Exception):
+    """The install was cancelled (Ctrl-C, preemption) before a step could run."""
+
+
+def get_journal_dir(cache_dir):
+    return Path(cache_dir) / JOURNAL_DIR_NAME
+
+
+def install_run_id(model_data, cache_dir):
+    """
+    Identify an install request, so 'pim install --resume' finds the journal of the same request.
+    """
+    payload = json.dumps([str(cache_dir), model_data], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class InstallJournal:
+    """
+    Durable, append only record of the steps an install completed.
+
+    Each line is a JSON event that is fsynced before the step is considered done, so a
+    run killed at any point (preemption, Ctrl-C) can be resumed from its last completed
+    step. A line cut short by a crash is ignored on resume.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.completed = {}
+        self.resumed = []
+        self.done_this_run = []
+        self.failures = {}
+
+        if resume:
+            if self.path.exists():
+                self._load()
+                debug(f"Resuming {self.path} with {len(self.completed)} completed steps")
+            else:
+                warning("No interrupted install to resume, starting from the beginning")
+        elif self.path.exists():
+            self.path.unlink()
+        self._file = open(self.path, "a")
+
+    def _load(self):
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if event.get("status") == "done":
+                    self.completed[event["step"]] = event.get("details", {})
+
+    def _append(self, event):
+        with self._lock:
+            self._file.write(json.dumps(event) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def is_done(self, step):
+        return step in self.completed
+
+    def details(self, step):
+        return self.completed.get(step, {})
+
+    def record(self, step, status, **details):
+        event = {"time": time.time(), "step": step, "status": status}
+        if details:
+            event["details"] = details
+        self._append(event)
+        if status == "done":
+            with self._lock:
+                self.completed[step] = details
+                self.done_this_run.append(step)
+
+    def fail(self, step, attempts, error):
+        with self._lock:
+            self.failures[step] = {"attempts": attempts, "error": str(error)}
+
+    def skip(self, step):
+        with self._lock:
+            self.resumed.append(step)
+        debug(f"Already done, skipping: {step}")
+
+    def summary(self, error=None):
+        return {
+            "journal": str(self.path),
+            "status": "failed" if error or self.failures else "completed",
+            "error": str(error) if error else None,
+            "duration_seconds": round(time.time() - self.started, 3),
+            "completed": list(self.done_this_run),
+            "skipped": list(self.resumed),
+            "failed": [
+                {"step": step, **failure} for step, failure in self.failures.items()
+            ],
+        }
+
+    def write_summary(self, error=None):
+        """
+        Write the machine readable summary of this run next to the journal and return its path.
+        """
+        summary_path = self.path.with_suffix(".summary.json")
+        write_json_atomic(summary_path, self.summary(error))
+        return summary_path
+
+    def close(self):
+        self._file.close()
+
+
+def check_cancelled(cancel, step):
+    if cancel is not None and cancel.is_set():
+        raise InstallCancelled(f"Install cancelled before {step}")
+
+
+def run_step(journal, step, fn, retries=INSTALL_RETRIES, cancel=None, **details):
+    """
+    Run fn as a journaled step: skip it if a previous run completed it, otherwise retry
+    it with exponential backoff and record the outcome. Without a journal, fn is just called.
+    fn may return a dict of details to store with the completed step, which is what a
+    skipped step returns in its place.
+    cancel is an optional threading.Event: once it is set, the step is not started and
+    a pending retry is abandoned, raising InstallCancelled.
+    """
+    check_cancelled(cancel, step)
+    if journal is None:
+        return fn()
+    if journal.is_done(step):
+        journal.skip(step)
+        return journal.details(step)
+
+    for attempt in range(retries + 1):
+        try:
+            result = fn()
+            break
+        except Exception as e:
+            journal.record(step, "failed", attempt=attempt + 1, error=str(e))
+            if attempt == retries:
+                journal.fail(step, attempt + 1, e)
+                raise
+            delay = RETRY_BACKOFF_SECONDS * 2**attempt
+            warning(f"{step} failed ({e}), retrying in {delay:.0f}s")
+            if cancel is not None:
+                # Wakes up as soon as the install is cancelled
+                cancel.wait(delay)
+            else:
+                time.sleep(delay)
+            check_cancelled(cancel, step)
+
+    journal.record(step, "done", **details, **(result if isinstance(result, dict) else {}))
+    return result
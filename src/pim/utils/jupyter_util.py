@@ -1,10 +1,146 @@
-import subprocess
+import json
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
 
+from pim.cli_utils.printing import debug, warning
+from pim.utils.conda import get_env_prefix
+from pim.utils.pathing import write_json_atomic
 
-def register_jupyter_kernel(env_name, display_name=None):
-    display_name = display_name or f"Pim: {env_name}"
-    subprocess.run(
-        f"conda run -n {env_name} python -m ipykernel install --user --name={env_name} --display-name='{display_name}'",
-        shell=True,
-        check=True,
+# Marks the kernel specs pim owns, so sync never touches kernels installed by other tools
+PIM_KERNEL_PREFIX = "pim-"
+
+
+def get_jupyter_data_dir():
+    """
+    Return Jupyter's user data directory, following the same rules as jupyter_core.
+    """
+    if os.environ.get("JUPYTER_DATA_DIR"):
+        return Path(os.environ["JUPYTER_DATA_DIR"]).expanduser()
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Jupyter"
+    if os.name == "nt":
+        appdata = os.environ.get("APPDATA")
+        return Path(appdata) / "jupyter" if appdata else Path.home() / ".jupyter" / "data"
+    xdg_data_home = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(xdg_data_home) / "jupyter"
+
+
+def get_kernels_dir():
+    return get_jupyter_data_dir() / "kernels"
+
+
+def kernel_name(env_name):
+    # Jupyter kernel names are limited to lowercase letters, digits, '.', '_' and '-'
+    name = re.sub(r"[^a-z0-9._-]", "-", env_name.lower())
+    # pim's own envs (pim-ai, pim-isolated-*) already carry the prefix
+    return name if name.startswith(PIM_KERNEL_PREFIX) else PIM_KERNEL_PREFIX + name
+
+
+def env_python(prefix):
+    if os.name == "nt":
+        return Path(prefix) / "python.exe"
+    return Path(prefix) / "bin" / "python"
+
+
+def has_ipykernel(prefix):
+    site_packages = (
+        [Path(prefix) / "Lib" / "site-packages"]
+        if os.name == "nt"
+        else list(Path(prefix).glob("lib/python*/site-packages"))
+    )
+    return any((path / "ipykernel").is_dir() for path in site_packages)
+
+
+def build_kernel_spec(env_name, prefix, display_name=None):
+    return {
+        "argv": [
+            str(env_python(prefix)),
+            "-m",
+            "ipykernel_launcher",
+            "-f",
+            "{connection_file}",
+        ],
+        "display_name": display_name or f"Pim: {env_name}",
+        "language": "python",
+        "metadata": {
+            "debugger": True,
+            "pim": {"env_name": env_name, "prefix": str(prefix)},
+        },
+    }
+
+
+def read_kernel_spec(kernel_dir):
+    try:
+        with open(kernel_dir / "kernel.json", "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_kernel_spec(kernel_dir, spec):
+    write_json_atomic(kernel_dir / "kernel.json", spec, indent=1)
+
+
+def is_pim_kernel(spec):
+    return bool(spec) and "pim" in spec.get("metadata", {})
+
+
+def sync_jupyter_kernels(envs, display_names=None, prune=False):
+    """
+    Write a Jupyter kernel spec for every env in envs ({env name: prefix}) in one pass,
+    without starting any process. Specs that are already up to date are left alone.
+
+    pim managed kernels whose env prefix no longer exists are removed. With prune,
+    pim managed kernels for envs not in envs are removed as well.
+    Returns a dict with the added, updated, unchanged and removed kernel names.
+    """
+    display_names = display_names or {}
+    kernels_dir = get_kernels_dir()
+    result = {"added": [], "updated": [], "unchanged": [], "removed": []}
+
+    wanted = set()
+    for env_name, prefix in envs.items():
+        name = kernel_name(env_name)
+        if not has_ipykernel(prefix):
+            warning(
+                f"ipykernel is not installed in {env_name}, add it to the Pimfile "
+                "dependencies to use this env from Jupyter"
+            )
+            continue
+        wanted.add(name)
+        spec = build_kernel_spec(env_name, prefix, display_names.get(env_name))
+        existing = read_kernel_spec(kernels_dir / name)
+        if existing == spec:
+            result["unchanged"].append(name)
+            continue
+        write_kernel_spec(kernels_dir / name, spec)
+        result["updated" if existing else "added"].append(name)
+
+    if kernels_dir.is_dir():
+        for kernel_dir in kernels_dir.glob(f"{PIM_KERNEL_PREFIX}*"):
+            if kernel_dir.name in wanted:
+                continue
+            spec = read_kernel_spec(kernel_dir)
+            if not is_pim_kernel(spec):
+                continue
+            prefix = spec["metadata"]["pim"]["prefix"]
+            if prune or not env_python(prefix).exists():
+                shutil.rmtree(kernel_dir)
+                result["removed"].append(kernel_dir.name)
+
+    debug(f"Synced Jupyter kernels in {kernels_dir}: {result}")
+    return result
+
+
+def register_jupyter_kernel(env_name, display_name=None, prefix=None):
+    """
+    Register a single conda env as a Jupyter kernel.
+    """
+    if prefix is None:
+        prefix = get_env_prefix(env_name)
+    return sync_jupyter_kernels(
+        {env_name: prefix}, display_names={env_name: display_name}
     )
@@ -0,0 +1,176 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from pim.cli_utils.printing import debug, info
+from pim.config.config import DEFAULT_CACHE_DIR, PACKAGE_CACHE_DIR_NAME
+
+
+def get_package_cache_dir(cache_dir=None):
+    return Path(cache_dir or DEFAULT_CACHE_DIR) / PACKAGE_CACHE_DIR_NAME
+
+
+def get_wheelhouse(cache_dir=None):
+    """
+    Return the shared wheelhouse directory used as a local pip index by every environment.
+    """
+    wheelhouse = get_package_cache_dir(cache_dir) / "wheels"
+    wheelhouse.mkdir(parents=True, exist_ok=True)
+    return wheelhouse
+
+
+def get_blob_store(cache_dir=None):
+    """
+    Return the content-addressed store holding one copy of every cached package file.
+    """
+    blobs = get_package_cache_dir(cache_dir) / "blobs"
+    blobs.mkdir(parents=True, exist_ok=True)
+    return blobs
+
+
+def get_conda_pkgs_dir(cache_dir=None):
+    """
+    Return the shared conda package cache, conda hardlinks from here into each env.
+    """
+    pkgs_dir = get_package_cache_dir(cache_dir) / "conda"
+    pkgs_dir.mkdir(parents=True, exist_ok=True)
+    return pkgs_dir
+
+
+def conda_cache_env(cache_dir=None):
+    """
+    Build the environment for conda subprocesses so they all share one package cache.
+    """
+    env = os.environ.copy()
+    env["CONDA_PKGS_DIRS"] = str(get_conda_pkgs_dir(cache_dir))
+    return env
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def link_or_copy(source, target):
+    """
+    Hardlink source to target, falling back to a copy when they live on different filesystems.
+    """
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def add_to_blob_store(path, cache_dir=None):
+    """
+    Store a file in the content-addressed blob store and return the blob path.
+    Files with identical content are only ever stored once.
+    """
+    digest = file_sha256(path)
+    blob = get_blob_store(cache_dir) / digest[:2] / digest
+    if not blob.exists():
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, blob)
+    return blob
+
+
+def ingest_into_wheelhouse(staging_dir, cache_dir=None):
+    """
+    Move freshly built wheels from staging_dir into the blob store and expose them
+    in the wheelhouse under their original file names.
+    Returns the list of file names newly added to the wheelhouse.
+    """
+    wheelhouse = get_wheelhouse(cache_dir)
+    added = []
+    for path in sorted(Path(staging_dir).iterdir()):
+        if not path.is_file():
+            continue
+        target = wheelhouse / path.name
+        if target.exists():
+            continue
+        blob = add_to_blob_store(path, cache_dir)
+        link_or_copy(blob, target)
+        added.append(path.name)
+    return added
+
+
+def fetch_pip_packages(env_name, pip_deps, cache_dir=None):
+    """
+    Download (and build where needed) wheels for pip_deps into the shared wheelhouse.
+    The env's own pip is used so the wheels match its Python version and platform.
+    """
+    wheelhouse = get_wheelhouse(cache_dir)
+    info(f"Fetching pip packages into shared cache: {', '.join(pip_deps)}")
+    # Stage next to the wheelhouse so moving into the blob store is a rename
+    staging_root = get_package_cache_dir(cache_dir)
+    with tempfile.TemporaryDirectory(dir=staging_root) as staging_dir:
+        subprocess.run(
+            ["conda", "run", "-n", env_name, "pip", "wheel"]
+            + ["--wheel-dir", staging_dir, "--find-links", str(wheelhouse)]
+            + pip_deps,
+            check=True,
+            stdout=sys.stdout,
+            stderr=sys.stderr,
+        )
+        added = ingest_into_wheelhouse(staging_dir, cache_dir)
+    debug(f"Added {len(added)} files to wheelhouse: {added}")
+
+
+def install_pip_from_cache(env_name, pip_deps, cache_dir=None):
+    """
+    Install pip dependencies into env_name from the shared wheelhouse with --no-index.
+    Requirements the wheelhouse cannot satisfy are fetched into it once, then installed locally.
+    """
+    offline_cmd = [
+        "conda",
+        "run",
+        "-n",
+        env_name,
+        "pip",
+        "install",
+        "--no-index",
+        "--find-links",
+        str(get_wheelhouse(cache_dir)),
+    ] + pip_deps
+
+    result = subprocess.run(offline_cmd, capture_output=True, text=True)
+    if result.returncode == 0:
+        debug(f"Installed {pip_deps} in {env_name} from local wheelhouse")
+        return
+
+    debug(f"Local wheelhouse cannot satisfy {pip_deps}: {result.stderr.strip()}")
+    fetch_pip_packages(env_name, pip_deps, cache_dir)
+    subprocess.run(offline_cmd, check=True, stdout=sys.stdout, stderr=sys.stderr)
+
+
+def install_conda_from_cache(env_name, conda_deps, cache_dir=None):
+    """
+    Install conda dependencies into env_name from the shared conda package cache.
+    An offline install is tried first, and only on a cache miss does conda go to the network.
+    """
+    base_cmd = ["conda", "install", "-n", env_name, "-y"]
+    result = subprocess.run(
+        base_cmd + ["--offline"] + conda_deps,
+        capture_output=True,
+        text=True,
+        env=conda_cache_env(cache_dir),
+    )
+    if result.returncode == 0:
+        debug(f"Installed {conda_deps} in {env_name} from local conda cache")
+        return
+
+    debug(f"Local conda cache cannot satisfy {conda_deps}, fetching from channels")
+    subprocess.run(
+        base_cmd + conda_deps,
+        check=True,
+        stdout=sys.stdout,
+        stderr=sys.stderr,
+        env=conda_cache_env(cache_dir),
+    )
@@ -1,7 +1,13 @@
+import json
 import os
+import tempfile
 from pathlib import Path
 
-from pim.config.config import DEFAULT_CACHE_DIR
+from pim.config.config import DEFAULT_CACHE_VOLUMES
+
+# Read once at import, os.umask can only be queried by setting it, which is not thread safe
+_UMASK = os.umask(0)
+os.umask(_UMASK)
 
 
 # TODO Use conf variable for default cache path
@@ -10,10 +16,49 @@ def validate_cache_path(string_path):
     This function is used to validate the cache directory path.
     It ensures the directory exists and resolves the full path.
     If the directory is not specified, it defaults to the environment variable PIM_CACHE_DIR, and if that is not set it uses the default path ~/.cache/pim
+    When several volumes are given (separated by os.pathsep), the first one is returned, see validate_cache_volumes.
+    """
+    return validate_cache_volumes(string_path)[0]
+
+
+def validate_cache_volumes(string_path):
+    """
+    This function is used to validate every cache volume in an os.pathsep separated list (e.g. /nvme0/pim:/nvme1/pim).
+    Each directory is created if needed, and the resolved paths are returned with the primary volume first.
     """
-    cache_dir_path = Path(string_path) if string_path else DEFAULT_CACHE_DIR
-    cache_dir_path.mkdir(parents=True, exist_ok=True)
-    return cache_dir_path.resolve()
+    if string_path:
+        volumes = [Path(path) for path in str(string_path).split(os.pathsep) if path]
+    else:
+        volumes = DEFAULT_CACHE_VOLUMES
+    resolved = []
+    for volume in volumes:
+        volume.mkdir(parents=True, exist_ok=True)
+        if volume.resolve() not in resolved:
+            resolved.append(volume.resolve())
+    return resolved
+
+
+def write_json_atomic(path, data, indent=2):
+    """
+    Write data as JSON to path through a temporary file and os.replace, so readers
+    (other threads, processes or a resumed run) never see a partially written file.
+    Parent directories are created as needed. Each write uses its own temporary file,
+    so concurrent writers never replace each other's partial file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, partial_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".partial"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+        # mkstemp creates the file 0600, give it the usual permissions
+        os.chmod(partial_path, 0o666 & ~_UMASK)
+        os.replace(partial_path, path)
+    except BaseException:
+        Path(partial_path).unlink(missing_ok=True)
+        raise
 
 
 def find_pimfile(start_path=Path.cwd()):
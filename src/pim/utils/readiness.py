@@ -0,0 +1,127 @@
+import json
+import time
+from pathlib import Path
+
+from pim.config.config import (
+    INSTALLABLE_FRAMEWORKS,
+    READY_POLL_INTERVAL,
+    SUPPORTED_FRAMEWORKS,
+)
+from pim.utils.pathing import write_json_atomic
+
+READY_DIR_NAME = "ready"
+
+
+def get_ready_dir(cache_dir):
+    return Path(cache_dir) / READY_DIR_NAME
+
+
+def ready_marker_path(cache_dir, framework, model):
+    # Same '/' -> '--' flattening as the Hugging Face cache folders
+    return get_ready_dir(cache_dir) / f"{framework}__{model.replace('/', '--')}.json"
+
+
+def mark_ready(cache_dir, framework, model, model_dir=None):
+    """
+    Publish that a model is fully installed, so waiting processes can load it.
+    The marker is written atomically, a reader never sees a partial one.
+    """
+    marker = ready_marker_path(cache_dir, framework, model)
+    write_json_atomic(
+        marker,
+        {
+            "framework": framework,
+            "model": model,
+            "path": str(model_dir) if model_dir else None,
+            "ready_at": time.time(),
+        },
+        indent=None,
+    )
+    return marker
+
+
+def clear_ready(cache_dir, framework, model):
+    ready_marker_path(cache_dir, framework, model).unlink(missing_ok=True)
+
+
+def split_model_spec(spec):
+    """
+    Split 'framework:model' into its parts. A bare model name matches any framework
+    and returns None as the framework.
+    """
+    if ":" in spec:
+        framework, model = spec.split(":", 1)
+        if framework in SUPPORTED_FRAMEWORKS:
+            return framework, model.strip()
+    return None, spec.strip()
+
+
+def read_ready(cache_dir, spec):
+    """
+    Return the ready marker of a model spec, or None if the model is not ready yet.
+    """
+    framework, model = split_model_spec(spec)
+    if framework is not None:
+        candidates = [ready_marker_path(cache_dir, framework, model)]
+    else:
+        candidates = [
+            ready_marker_path(cache_dir, framework, model)
+            for framework in sorted(INSTALLABLE_FRAMEWORKS)
+        ]
+    for marker in candidates:
+        try:
+            with open(marker, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def check_waitable(specs):
+    """
+    Return specs as a list, raising ValueError for models of a framework pim does not
+    install, since they would never become ready.
+    """
+    if isinstance(specs, str):
+        specs = [specs]
+    unpublished = [
+        spec
+        for spec in specs
+        if split_model_spec(spec)[0] not in (None, *INSTALLABLE_FRAMEWORKS)
+    ]
+    if unpublished:
+        raise ValueError(
+            f"pim cannot install {', '.join(unpublished)} yet, waiting for them would never end"
+        )
+    return specs
+
+
+def collect_ready(cache_dir, specs, ready):
+    """
+    Add the markers of the specs that became ready to ready ({spec: marker}).
+    Returns True once every spec is ready.
+    """
+    for spec in specs:
+        if spec not in ready:
+            marker = read_ready(cache_dir, spec)
+            if marker is not None:
+                ready[spec] = marker
+    return len(ready) == len(specs)
+
+
+def wait_until_ready(specs, cache_dir, timeout=None, poll_interval=READY_POLL_INTERVAL):
+    """
+    Block until every model spec has a ready marker and return {spec: marker}.
+    Raises TimeoutError if timeout seconds pass first, and ValueError right away for
+    specs that can never become ready (see check_waitable).
+    """
+    specs = check_waitable(specs)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    ready = {}
+    while True:
+        if collect_ready(cache_dir, specs, ready):
+            return ready
+        if deadline is not None and time.monotonic() >= deadline:
+            pending = [spec for spec in specs if spec not in ready]
+            raise TimeoutError(f"Models not ready after {timeout}s: {', '.join(pending)}")
+        time.sleep(poll_interval)
@@ -0,0 +1,253 @@
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+from pim.cli_utils.printing import debug, info, success, warning
+from pim.config.config import STRIPE_MIN_BYTES
+from pim.utils.pathing import write_json_atomic
+
+VOLUME_INDEX_NAME = "volumes.json"
+STRIPES_DIR_NAME = "stripes"
+
+
+class VolumeIndex:
+    """
+    Index of the cache volumes and of where each large model file is stored.
+
+    It lives on the primary volume, which also holds the Hugging Face cache tree that
+    loaders read from. Striped files are stored under <volume>/stripes/ and linked into
+    that tree, and the index maps model -> file -> volume so lookups never scan disks.
+    """
+
+    def __init__(self, primary):
+        self.primary = Path(primary)
+        self.path = self.primary / VOLUME_INDEX_NAME
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                self._data = json.load(f)
+        else:
+            self._data = {"volumes": [str(self.primary)], "models": {}}
+
+    @property
+    def volumes(self):
+        return [Path(volume) for volume in self._data["volumes"]]
+
+    def set_volumes(self, volumes):
+        with self._lock:
+            self._data["volumes"] = [str(volume) for volume in volumes]
+
+    def revision(self, model):
+        return self._data["models"].get(model, {}).get("revision")
+
+    def lookup(self, model):
+        """Return the {file: entry} placement of a model, or an empty dict."""
+        return self._data["models"].get(model, {}).get("files", {})
+
+    def record(self, model, revision, file, volume, size, stored, link):
+        with self._lock:
+            entry = self._data["models"].setdefault(
+                model, {"revision": revision, "files": {}}
+            )
+            entry["revision"] = revision
+            entry["files"][file] = {
+                "volume": str(volume),
+                "size": size,
+                "stored": str(stored),
+                "link": str(link),
+            }
+
+    def entries(self):
+        for model, model_entry in self._data["models"].items():
+            for file, entry in model_entry["files"].items():
+                yield model, file, entry
+
+    def save(self):
+        with self._lock:
+            write_json_atomic(self.path, self._data)
+
+
+def register_cache_volumes(volumes):
+    """
+    Add the configured volumes that are not registered yet to the primary volume's index
+    and return the primary. Volumes are never dropped here, a command run with fewer
+    volumes still sees the files striped onto the others; see remove_cache_volumes.
+    """
+    index = VolumeIndex(volumes[0])
+    registered = index.volumes
+    added = [Path(volume) for volume in volumes if Path(volume) not in registered]
+    if added:
+        index.set_volumes(registered + added)
+        index.save()
+        debug(f"Registered cache volumes: {', '.join(map(str, added))}")
+    return volumes[0]
+
+
+def remove_cache_volumes(primary, volumes):
+    """
+    Move every striped file off the given volumes onto the remaining ones, then
+    unregister them. The primary volume cannot be removed.
+    Returns the number of files moved.
+    """
+    index = VolumeIndex(primary)
+    removed = [Path(volume) for volume in volumes]
+    if Path(primary) in removed:
+        raise ValueError(f"{primary} is the primary cache volume and cannot be removed")
+    unknown = [volume for volume in removed if volume not in index.volumes]
+    if unknown:
+        raise ValueError(
+            f"Not a registered cache volume: {', '.join(map(str, unknown))}"
+        )
+
+    remaining = [volume for volume in index.volumes if volume not in removed]
+    entries = [
+        (model, file, entry)
+        for model, file, entry in index.entries()
+        if Path(entry["volume"]) in removed
+    ]
+    compressed = [
+        f"{model}/{file}"
+        for model, file, entry in entries
+        if not Path(entry["stored"]).exists()
+    ]
+    if compressed:
+        raise RuntimeError(
+            f"Restore {', '.join(compressed)} with 'pim cache restore' before removing its volume"
+        )
+
+    free = {volume: free_bytes(volume) for volume in remaining}
+    for model, file, entry in sorted(entries, key=lambda e: -e[2]["size"]):
+        target = max(remaining, key=lambda v: (free[v], -remaining.index(v)))
+        if free[target] < entry["size"]:
+            raise RuntimeError(
+                f"No remaining volume has room for {model}/{file} ({entry['size'] / 1e9:.1f} GB)"
+            )
+        debug(f"Moving {model}/{file} from {entry['volume']} to {target}")
+        move_striped_file(index, model, file, entry, target)
+        free[target] -= entry["size"]
+
+    index.set_volumes(remaining)
+    index.save()
+    success(
+        f"Removed {', '.join(map(str, removed))} from the cache volumes, moved {len(entries)} files"
+    )
+    return len(entries)
+
+
+def free_bytes(volume):
+    return shutil.disk_usage(volume).free
+
+
+def stripe_dir(volume, repo_folder, revision):
+    return Path(volume) / STRIPES_DIR_NAME / repo_folder / revision
+
+
+def place_files(files, volumes):
+    """
+    Choose a volume for every large file of one model.
+    Files are handed out largest first to the volume with the fewest bytes of this model
+    so far, so shards of one model sit on different devices and can be read in parallel.
+    Ties go to the volume with the most free space, and a volume is only used if the file fits.
+    Small files are not striped and map to None.
+    """
+    free = {volume: free_bytes(volume) for volume in volumes}
+    assigned = {volume: 0 for volume in volumes}
+    placement = {}
+    for file, size in sorted(files, key=lambda f: (-f[1], f[0])):
+        if size < STRIPE_MIN_BYTES:
+            placement[file] = None
+            continue
+        fitting = [volume for volume in volumes if free[volume] >= size]
+        candidates = fitting or volumes
+        target = min(
+            candidates,
+            key=lambda v: (assigned[v], -free[v], volumes.index(v)),
+        )
+        placement[file] = target
+        assigned[target] += size
+        free[target] -= size
+    return placement
+
+
+def replace_symlink(link, target):
+    """
+    Atomically point link at target, creating parent directories as needed.
+    """
+    link = Path(link)
+    link.parent.mkdir(parents=True, exist_ok=True)
+    tmp_link = link.with_name(f".{link.name}.pim-tmp")
+    if tmp_link.is_symlink() or tmp_link.exists():
+        tmp_link.unlink()
+    tmp_link.symlink_to(target)
+    os.replace(tmp_link, link)
+
+
+def move_striped_file(index, model, file, entry, target_volume):
+    """
+    Move one striped file to target_volume and repoint its link in the primary cache tree.
+    """
+    source = Path(entry["stored"])
+    relative = source.relative_to(Path(entry["volume"]) / STRIPES_DIR_NAME)
+    destination = Path(target_volume) / STRIPES_DIR_NAME / relative
+    destination.parent.mkdir(parents=True, exist_ok=True)
+
+    # Copy under a temporary name first so an interrupted move never loses the file
+    partial = destination.with_name(f"{destination.name}.partial")
+    shutil.copyfile(source, partial)
+    os.replace(partial, destination)
+    replace_symlink(entry["link"], destination)
+    source.unlink()
+
+    index.record(
+        model,
+        index.revision(model),
+        file,
+        target_volume,
+        entry["size"],
+        destination,
+        entry["link"],
+    )
+    # Persist after every move so the index always matches the disks
+    index.save()
+
+
+def rebalance_volumes(primary):
+    """
+    Move striped files from the fullest volumes to the emptiest ones, e.g. after adding a volume.
+    A file is only moved when that narrows the free space gap between the two volumes.
+    Returns the number of files moved.
+    """
+    index = VolumeIndex(primary)
+    volumes = index.volumes
+    if len(volumes) < 2:
+        warning("Only one cache volume is configured, nothing to rebalance")
+        return 0
+
+    free = {volume: free_bytes(volume) for volume in volumes}
+    moved = 0
+    entries = sorted(index.entries(), key=lambda e: -e[2]["size"])
+    for model, file, entry in entries:
+        source = Path(entry["volume"])
+        if source not in free:
+            warning(f"{model}/{file} is on {source}, which is no longer configured")
+            continue
+        if not Path(entry["stored"]).exists():
+            # Compressed in cold storage, it is moved once restored
+            debug(f"Skipping {model}/{file}, it is not stored uncompressed")
+            continue
+        target = max(volumes, key=lambda v: (free[v], -volumes.index(v)))
+        size = entry["size"]
+        if target == source or free[target] - free[source] < 2 * size:
+            continue
+        debug(f"Moving {model}/{file} from {source} to {target}")
+        move_striped_file(index, model, file, entry, target)
+        free[target] -= size
+        free[source] += size
+        moved += 1
+
+    for volume in volumes:
+        info(f"{volume}: {free[volume] / 1e9:.1f} GB free")
+    success(f"Rebalanced cache volumes, moved {moved} files")
+    return moved
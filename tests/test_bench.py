@@ -0,0 +1,59 @@
+import os
+from pathlib import Path
+
+import pytest
+
+torch = pytest.importorskip("torch")
+safetensors_torch = pytest.importorskip("safetensors.torch")
+
+from pim.cli_utils.console import init_console  # noqa: E402
+from pim.commands.utils.benchmark import bench_target, checkpoint_target  # noqa: E402
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+METRICS = (
+    "import_seconds",
+    "time_to_first_tensor_seconds",
+    "load_seconds",
+    "peak_rss_bytes",
+    "bytes_read",
+    "bytes_requested",
+)
+
+
+@pytest.fixture(autouse=True)
+def bench_env(monkeypatch):
+    init_console(quiet=True)
+    # The worker runs in a fresh interpreter, it must find this checkout of pim
+    pythonpath = os.environ.get("PYTHONPATH")
+    monkeypatch.setenv(
+        "PYTHONPATH", os.pathsep.join(filter(None, [str(SRC_DIR), pythonpath]))
+    )
+
+
+def tiny_state_dict():
+    return {"weight": torch.randn(16, 8), "bias": torch.zeros(16)}
+
+
+@pytest.mark.parametrize("name", ["model.safetensors", "model.pt"])
+def test_bench_checkpoint(tmp_path, name):
+    checkpoint = tmp_path / name
+    if checkpoint.suffix == ".safetensors":
+        safetensors_torch.save_file(tiny_state_dict(), str(checkpoint))
+    else:
+        torch.save(tiny_state_dict(), checkpoint)
+
+    result = bench_target(checkpoint_target(checkpoint), runs=1)
+
+    assert result["framework"] == "checkpoint"
+    assert result["model"] == name
+    for run in ("cold", "warm"):
+        assert len(result[run]) == 1
+        metrics = result[run][0]
+        assert set(METRICS) <= set(metrics)
+        assert 0 < metrics["time_to_first_tensor_seconds"] <= metrics["load_seconds"]
+        assert metrics["peak_rss_bytes"] > 0
+
+
+def test_checkpoint_target_missing(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        checkpoint_target(tmp_path / "missing.safetensors")
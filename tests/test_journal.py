@@ -0,0 +1,175 @@
+import json
+import threading
+
+import pytest
+
+from pim.cli_utils.console import init_console
+from pim.config.config import RETRY_BACKOFF_SECONDS
+from pim.utils import journal as journal_module
+from pim.utils.journal import (
+    InstallCancelled,
+    InstallJournal,
+    install_run_id,
+    run_step,
+)
+
+
+@pytest.fixture(autouse=True)
+def quiet_console():
+    init_console(quiet=True)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(journal_module.time, "sleep", delays.append)
+    return delays
+
+
+def flaky(failures, result=None):
+    calls = []
+
+    def fn():
+        calls.append(len(calls))
+        if len(calls) <= failures:
+            raise OSError(f"attempt {len(calls)} failed")
+        return result
+
+    return fn, calls
+
+
+def test_resume_skips_done_steps(tmp_path):
+    path = tmp_path / "run.jsonl"
+    journal = InstallJournal(path)
+    run_step(journal, "model:a", lambda: {"path": "/models/a"})
+    journal.close()
+
+    resumed = InstallJournal(path, resume=True)
+    fn, calls = flaky(0)
+    assert run_step(resumed, "model:a", fn) == {"path": "/models/a"}
+    run_step(resumed, "model:b", fn)
+    resumed.close()
+
+    assert len(calls) == 1
+    assert resumed.resumed == ["model:a"]
+    assert resumed.done_this_run == ["model:b"]
+
+
+def test_without_resume_starts_over(tmp_path):
+    path = tmp_path / "run.jsonl"
+    journal = InstallJournal(path)
+    journal.record("model:a", "done")
+    journal.close()
+
+    fresh = InstallJournal(path)
+    fresh.close()
+    assert not fresh.is_done("model:a")
+
+
+def test_retries_with_exponential_backoff(tmp_path, sleeps):
+    journal = InstallJournal(tmp_path / "run.jsonl")
+    fn, calls = flaky(2, result={"files": 3})
+
+    assert run_step(journal, "model:a", fn, retries=3) == {"files": 3}
+    journal.close()
+
+    assert len(calls) == 3
+    assert sleeps == [RETRY_BACKOFF_SECONDS, RETRY_BACKOFF_SECONDS * 2]
+    assert journal.details("model:a") == {"files": 3}
+    events = [json.loads(line) for line in journal.path.read_text().splitlines()]
+    assert [event["status"] for event in events] == ["failed", "failed", "done"]
+    assert journal.failures == {}
+
+
+def test_gives_up_after_retries(tmp_path, sleeps):
+    journal = InstallJournal(tmp_path / "run.jsonl")
+    fn, calls = flaky(10)
+
+    with pytest.raises(OSError):
+        run_step(journal, "model:a", fn, retries=2)
+    journal.close()
+
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+    assert journal.failures["model:a"]["attempts"] == 3
+    assert not journal.is_done("model:a")
+
+
+def test_cancelled_step_does_not_run(tmp_path):
+    journal = InstallJournal(tmp_path / "run.jsonl")
+    cancel = threading.Event()
+    cancel.set()
+    fn, calls = flaky(0)
+
+    with pytest.raises(InstallCancelled):
+        run_step(journal, "model:a", fn, cancel=cancel)
+    journal.close()
+    assert calls == []
+
+
+def test_truncated_trailing_line_is_ignored(tmp_path):
+    path = tmp_path / "run.jsonl"
+    journal = InstallJournal(path)
+    journal.record("model:a", "done", path="/models/a")
+    journal.close()
+    # A crash while appending leaves half a line behind
+    with open(path, "a") as f:
+        f.write('{"time": 1, "step": "model:b", "sta')
+
+    resumed = InstallJournal(path, resume=True)
+    resumed.close()
+    assert resumed.is_done("model:a")
+    assert resumed.details("model:a") == {"path": "/models/a"}
+    assert not resumed.is_done("model:b")
+
+
+def test_summary_contents(tmp_path, sleeps):
+    path = tmp_path / "run.jsonl"
+    journal = InstallJournal(path)
+    run_step(journal, "env", lambda: None)
+    journal.close()
+
+    resumed = InstallJournal(path, resume=True)
+    run_step(resumed, "env", lambda: None)
+    run_step(resumed, "model:a", lambda: None)
+    with pytest.raises(OSError):
+        run_step(resumed, "model:b", flaky(10)[0], retries=1)
+    resumed.close()
+    summary_path = resumed.write_summary()
+
+    assert summary_path == tmp_path / "run.summary.json"
+    summary = json.loads(summary_path.read_text())
+    assert summary["journal"] == str(path)
+    assert summary["status"] == "failed"
+    assert summary["error"] is None
+    assert summary["completed"] == ["model:a"]
+    assert summary["skipped"] == ["env"]
+    assert summary["failed"] == [
+        {"step": "model:b", "attempts": 2, "error": "attempt 2 failed"}
+    ]
+    assert summary["duration_seconds"] >= 0
+
+
+def test_summary_of_completed_run(tmp_path):
+    journal = InstallJournal(tmp_path / "run.jsonl")
+    run_step(journal, "model:a", lambda: None)
+    journal.close()
+
+    summary = journal.summary()
+    assert summary["status"] == "completed"
+    assert journal.summary(KeyboardInterrupt("interrupted"))["status"] == "failed"
+
+
+def test_install_run_id_is_stable(tmp_path):
+    model_data = {
+        "huggingface": ["bert-base-uncased", "gpt2"],
+        "env-name": "pim-ai",
+        "pip-dependencies": ["transformers"],
+    }
+    reordered = dict(reversed(list(model_data.items())))
+
+    run_id = install_run_id(model_data, tmp_path)
+    assert run_id == install_run_id(reordered, str(tmp_path))
+    assert len(run_id) == 16
+    assert run_id != install_run_id(model_data, tmp_path / "other")
+    assert run_id != install_run_id({**model_data, "huggingface": ["gpt2"]}, tmp_path)